@@ -0,0 +1,214 @@
+import re
+from urllib.parse import parse_qs, urlparse
+
+import http_client
+import workday
+
+# name -> adapter instance, in detection order
+adapters = {}
+
+
+def register(adapter_class):
+    """
+    Class decorator adding an adapter to the registry.
+    """
+    adapters[adapter_class.name] = adapter_class()
+    return adapter_class
+
+
+class Adapter:
+    """
+    Lists all postings of a hosted job board from its public feed.
+
+    Subclasses set `name` and `host`, a pattern for the board's hostname,
+    and implement fetch(). `api_base` can be pointed at a local mock
+    server.
+    """
+
+    name = ""
+    host = None
+    api_base = ""
+
+    def board(self, url):
+        """
+        Args:
+            url (str): A careers URL
+
+        Returns:
+            str or None: The board token, or None if the URL is not on this ATS
+        """
+        parsed = urlparse(url)
+        if not self.host.search(parsed.netloc.lower()):
+            return None
+        segments = [segment for segment in parsed.path.split("/") if segment]
+        return segments[0] if segments else None
+
+    def fetch(self, board):
+        """
+        Args:
+            board: The value returned by board()
+
+        Returns:
+            list: {"title", "url", "location"} dicts
+        """
+        raise NotImplementedError
+
+    def get_json(self, url, **kwargs):
+        response = http_client.get(
+            url, headers={"Accept": "application/json"}, **kwargs
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+@register
+class Greenhouse(Adapter):
+    name = "greenhouse"
+    host = re.compile(r"(^|\.)(job-)?boards\.greenhouse\.io$")
+    api_base = "https://boards-api.greenhouse.io"
+
+    def board(self, url):
+        # Embedded boards: boards.greenhouse.io/embed/job_board?for=acme
+        token = parse_qs(urlparse(url).query).get("for")
+        if token and self.host.search(urlparse(url).netloc.lower()):
+            return token[0]
+        board = super().board(url)
+        return None if board == "embed" else board
+
+    def fetch(self, board):
+        data = self.get_json(f"{self.api_base}/v1/boards/{board}/jobs")
+        return [
+            {
+                "title": job.get("title", ""),
+                "url": job["absolute_url"],
+                "location": (job.get("location") or {}).get("name"),
+            }
+            for job in data.get("jobs", [])
+            if job.get("absolute_url")
+        ]
+
+
+@register
+class Lever(Adapter):
+    name = "lever"
+    host = re.compile(r"^jobs\.(eu\.)?lever\.co$")
+    api_base = "https://api.lever.co"
+    # Boards on jobs.eu.lever.co are only served by the EU API
+    eu_api_base = "https://api.eu.lever.co"
+
+    def board(self, url):
+        token = super().board(url)
+        if token is None:
+            return None
+        return token, urlparse(url).netloc.lower().startswith("jobs.eu.")
+
+    def fetch(self, board):
+        token, eu = board
+        api_base = self.eu_api_base if eu else self.api_base
+        data = self.get_json(f"{api_base}/v0/postings/{token}?mode=json")
+        return [
+            {
+                "title": job.get("text", ""),
+                "url": job["hostedUrl"],
+                "location": (job.get("categories") or {}).get("location"),
+            }
+            for job in data
+            if job.get("hostedUrl")
+        ]
+
+
+@register
+class Ashby(Adapter):
+    name = "ashby"
+    host = re.compile(r"^jobs\.ashbyhq\.com$")
+    api_base = "https://api.ashbyhq.com"
+
+    def fetch(self, board):
+        data = self.get_json(f"{self.api_base}/posting-api/job-board/{board}")
+        return [
+            {
+                "title": job.get("title", ""),
+                "url": job["jobUrl"],
+                "location": job.get("location"),
+            }
+            for job in data.get("jobs", [])
+            if job.get("jobUrl")
+        ]
+
+
+@register
+class SmartRecruiters(Adapter):
+    name = "smartrecruiters"
+    host = re.compile(r"^(jobs|careers)\.smartrecruiters\.com$")
+    api_base = "https://api.smartrecruiters.com"
+    page_size = 100
+
+    def fetch(self, board):
+        jobs = []
+        offset = 0
+        while True:
+            data = self.get_json(
+                f"{self.api_base}/v1/companies/{board}/postings",
+                params={"limit": self.page_size, "offset": offset},
+            )
+            content = data.get("content") or []
+            for job in content:
+                jobs.append(
+                    {
+                        "title": job.get("name", ""),
+                        "url": f"https://jobs.smartrecruiters.com/{board}/{job['id']}",
+                        "location": (job.get("location") or {}).get("city"),
+                    }
+                )
+            offset += len(content)
+            if not content or offset >= data.get("totalFound", 0):
+                return jobs
+
+
+@register
+class Workday(Adapter):
+    name = "workday"
+    host = workday.workday_host
+    api_base = None
+
+    def board(self, url):
+        return workday.parse_workday_url(url, self.api_base)
+
+    def fetch(self, board):
+        return workday.fetch_jobs(board)
+
+
+def detect(url):
+    """
+    Find the ATS adapter for a careers URL.
+
+    Args:
+        url (str): The careers URL, e.g. from get_highest_scored_link
+
+    Returns:
+        tuple or None: (adapter, board) if the URL is on a supported ATS
+    """
+    for adapter in adapters.values():
+        board = adapter.board(url)
+        if board:
+            return adapter, board
+    return None
+
+
+def extract_ats_jobs(url):
+    """
+    List all postings of the ATS board behind a careers URL.
+
+    Args:
+        url (str): The careers URL
+
+    Returns:
+        list or None: Job dicts, or None if the URL is not on a supported ATS
+    """
+    detected = detect(url)
+    if detected is None:
+        return None
+    adapter, board = detected
+    jobs = adapter.fetch(board)
+    print(f"[{adapter.name}] {len(jobs)} postings for {url}")
+    return jobs
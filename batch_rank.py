@@ -0,0 +1,175 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import llm_cache
+import prompts
+
+# Same line format that openings.get_highest_scored_link parses
+ranked_line = re.compile(r"(\d+)\. +(https?://[^\s]+|/[^\s]+) - (\d+)/100:")
+
+company_block = re.compile(
+    r"=== COMPANY (\d+) ===\s*\n(.*?)^=== END \1 ===", re.DOTALL | re.MULTILINE
+)
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for Gemini prompts (about four characters per token).
+
+    Args:
+        text (str): The prompt text
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    return len(text) // 4 + 1
+
+
+def format_company(company_id, links):
+    return f'<company id="{company_id}">\n' + "\n".join(links) + "\n</company>\n"
+
+
+def pack_batches(companies, token_budget=6000, max_companies=25):
+    """
+    Group companies so each batch prompt stays under a token budget.
+
+    max_companies also bounds the size of the answer: each company needs
+    roughly 200 output tokens and the model stops at 8192.
+
+    Args:
+        companies (list): (company_id, links) tuples
+        token_budget (int): Maximum estimated input tokens per batch
+        max_companies (int): Maximum number of companies per batch
+
+    Returns:
+        list: Lists of (company_id, links) tuples
+    """
+    budget = token_budget - estimate_tokens(prompts.linkRankerBatch)
+    batches = []
+    batch, used = [], 0
+    for company_id, links in companies:
+        cost = estimate_tokens(format_company(company_id, links))
+        if batch and (used + cost > budget or len(batch) >= max_companies):
+            batches.append(batch)
+            batch, used = [], 0
+        # A company larger than the budget still gets a batch of its own
+        batch.append((company_id, links))
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def split_response(response):
+    """
+    Demultiplex a batched ranking response into one section per company.
+
+    Args:
+        response (str): The LLM output for a batch prompt
+
+    Returns:
+        dict: Batch-local company id (int) -> ranked list text
+    """
+    return {
+        int(match.group(1)): match.group(2).strip()
+        for match in company_block.finditer(response or "")
+    }
+
+
+def is_valid_ranking(section):
+    return any(ranked_line.search(line) for line in section.split("\n"))
+
+
+def rank_batch(batch, generate):
+    """
+    Rank one batch of companies in a single LLM call.
+
+    Args:
+        batch (list): (company_id, links) tuples
+        generate (callable): The generate(prompt) function
+
+    Returns:
+        tuple: (rankings dict company_id -> text, list of failed tuples)
+    """
+    payload = "".join(
+        format_company(index, links) for index, (_, links) in enumerate(batch, 1)
+    )
+    # pydantic is only imported when structured output is used
+    import structured
+
+    if structured.settings["enabled"]:
+        sections = structured.rank_batch(generate, payload, len(batch))
+    else:
+        sections = split_response(
+            llm_cache.cached_generate(generate, prompts.linkRankerBatch, payload)
+        )
+
+    rankings, failed = {}, []
+    for index, (company_id, links) in enumerate(batch, 1):
+        section = sections.get(index)
+        # An empty block is the prompt's answer for "no likely job URLs";
+        # only a missing or garbled block is retried
+        if section is not None and (not section or is_valid_ranking(section)):
+            rankings[company_id] = section
+        else:
+            failed.append((company_id, links))
+    return rankings, failed
+
+
+def rank_companies(
+    companies, generate, token_budget=6000, max_companies=25, retries=1, workers=8
+):
+    """
+    Rank the links of many companies with as few LLM calls as possible.
+
+    Companies whose section of a batched answer is missing or cannot be
+    parsed are re-batched up to `retries` times, then ranked one by one
+    with the plain linkRanker prompt. An empty section is a valid "no
+    likely job URLs" answer.
+
+    Args:
+        companies (list): (company_id, links) tuples
+        generate (callable): The generate(prompt) function
+        token_budget (int): Maximum estimated input tokens per batch
+        max_companies (int): Maximum number of companies per batch
+        retries (int): Number of batched re-runs for failed companies
+        workers (int): Batches sent at once; the llm gateway keeps their
+                       requests in flight together
+
+    Returns:
+        dict: company_id -> ranked list text in linkRanker format
+    """
+    rankings = {}
+    pending = [(company_id, links) for company_id, links in companies if links]
+    for company_id, links in companies:
+        if not links:
+            rankings[company_id] = ""
+
+    for attempt in range(retries + 1):
+        failed = []
+        batches = pack_batches(pending, token_budget, max_companies)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch_rankings, batch_failed in executor.map(
+                lambda batch: rank_batch(batch, generate), batches
+            ):
+                rankings.update(batch_rankings)
+                failed.extend(batch_failed)
+        if not failed:
+            return rankings
+        print(f"Re-running ranking for {len(failed)} companies")
+        pending = failed
+        # Smaller batches give the model less room to drop a company
+        max_companies = max(1, max_companies // 2)
+
+    import structured
+
+    def rank_one(links):
+        if structured.settings["enabled"]:
+            return structured.rank_links(generate, links)
+        return llm_cache.cached_generate(generate, prompts.linkRanker, "\n".join(links))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        ranked = executor.map(rank_one, [links for _, links in pending])
+        for (company_id, _), ranking in zip(pending, ranked):
+            rankings[company_id] = ranking
+    return rankings
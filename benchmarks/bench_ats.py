@@ -0,0 +1,104 @@
+"""
+Run the ATS adapters and the Workday CXS client against local mock feeds.
+
+    python benchmarks/bench_ats.py [--latency 0.05]
+
+Each adapter's api_base is pointed at benchmarks.fixtures.SiteServer,
+which serves every board in the vendor's own JSON format. A case fails
+unless it lists every posting of the mock board exactly once, so this
+also checks detection, paging (SmartRecruiters, Workday) and the Workday
+page size limit. Times include http_client's per-host politeness pacing,
+since every mock board is on the same host.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ats  # noqa: E402
+import workday  # noqa: E402
+from fixtures import SiteServer, ats_jobs_per_board  # noqa: E402
+
+cases = [
+    ("greenhouse", "https://boards.greenhouse.io/acme"),
+    ("greenhouse", "https://boards.greenhouse.io/embed/job_board?for=acme"),
+    ("lever", "https://jobs.lever.co/acme"),
+    ("lever", "https://jobs.eu.lever.co/eu-acme"),
+    ("ashby", "https://jobs.ashbyhq.com/acme"),
+    ("smartrecruiters", "https://jobs.smartrecruiters.com/acme"),
+    ("workday", "https://acme.wd5.myworkdayjobs.com/en-US/External"),
+]
+
+
+def check(jobs, expected_prefix):
+    urls = [job["url"] for job in jobs]
+    problems = []
+    if len(urls) != ats_jobs_per_board:
+        problems.append(f"{len(urls)} of {ats_jobs_per_board} postings")
+    if len(set(urls)) != len(urls):
+        problems.append("duplicate postings")
+    if not all(url.startswith(expected_prefix) for url in urls):
+        problems.append(f"postings outside {expected_prefix}")
+    if not all(job["title"] and job["location"] for job in jobs):
+        problems.append("postings without title or location")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SECONDS")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'case':58} {'jobs':>5} {'requests':>8} {'ms':>8}")
+    with SiteServer(latency=args.latency) as server:
+        for adapter in ats.adapters.values():
+            adapter.api_base = server.origin
+            if adapter.name != "workday":
+                adapter.api_base += f"/ats/{adapter.name}"
+        ats.adapters["lever"].eu_api_base = f"{server.origin}/ats/lever-eu"
+
+        # (label, adapter name, url, call)
+        runs = [
+            (f"ats {url}", name, url, lambda url=url: ats.extract_ats_jobs(url))
+            for name, url in cases
+        ]
+        url = cases[-1][1]
+        runs.append(
+            (
+                "workday.fetch_jobs",
+                "workday",
+                url,
+                lambda url=url: workday.fetch_jobs(
+                    workday.parse_workday_url(url, server.origin)
+                ),
+            )
+        )
+
+        for label, name, url, run in runs:
+            detected = ats.detect(url)
+            requests_before = server.requests
+            start = time.perf_counter()
+            try:
+                jobs = run()
+                problems = check(jobs, "https://")
+                if detected is None or detected[0].name != name:
+                    problems.append(f"detected as {detected and detected[0].name}")
+            except Exception as e:
+                jobs, problems = [], [f"{type(e).__name__}: {e}"]
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"{label:58} {len(jobs):>5} {server.requests - requests_before:>8}"
+                f" {elapsed:8.1f}"
+            )
+            for problem in problems:
+                print(f"  FAILED: {problem}")
+            failures += bool(problems)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
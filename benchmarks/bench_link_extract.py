@@ -0,0 +1,186 @@
+"""
+Compare link_extract against the BeautifulSoup html.parser code it replaced.
+
+Pages are read from benchmarks/pages/*.html. Record some first with
+
+    python benchmarks/bench_link_extract.py --record https://example.com/careers
+
+Without recorded pages a synthetic careers listing is used. With
+--processes N the pages are also parsed from 16 threads at once, in-process
+and through a pool of N parser processes ("auto" for one per spare core).
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import link_extract  # noqa: E402
+
+pages_dir = Path(__file__).resolve().parent / "pages"
+
+
+def bs4_hrefs(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [link["href"] for link in soup.find_all(href=True)]
+
+
+def bs4_anchor_links(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.string if soup.title else None
+    base_url = "{0.scheme}://{0.netloc}".format(urlparse(url))
+    links = []
+    for a_tag in soup.find_all("a", href=True):
+        href = a_tag["href"]
+        if href.startswith("javascript:") or href.startswith("#"):
+            continue
+        if not href.startswith(("http://", "https://")):
+            href = urljoin(base_url, href)
+        links.append({"url": href, "text": link_extract.truncate_text(a_tag.text)})
+    return title, links
+
+
+def synthetic_page(jobs=2000):
+    rows = "\n".join(
+        f'<li class="job"><a href="/jobs/{n}?src=list">Software Engineer {n}, '
+        f"<span>Platform &amp; Infrastructure</span></a><p>Remote</p></li>"
+        for n in range(jobs)
+    )
+    return (
+        "<html><head><title>Careers</title></head><body>"
+        '<nav><a href="/">Home</a><a href="#main">Skip</a></nav>'
+        f"<ul>{rows}</ul>"
+        '<a href="/jobs?page=2">Next</a></body></html>'
+    )
+
+
+def record(urls):
+    import http_client
+
+    pages_dir.mkdir(exist_ok=True)
+    for url in urls:
+        try:
+            response = http_client.get(url)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Failed to record {url}: {e}")
+            continue
+        name = re.sub(r"[^\w.-]+", "_", urlparse(url).netloc + urlparse(url).path)
+        path = pages_dir / f"{name.strip('_')}.html"
+        # The page URL goes in the first line so relative links resolve the same way
+        path.write_text(f"<!-- {url} -->\n{response.text}", encoding="utf-8")
+        print(f"Recorded {url} -> {path}")
+
+
+def load_pages():
+    pages = []
+    for path in sorted(pages_dir.glob("*.html")):
+        html = path.read_text(encoding="utf-8", errors="replace")
+        match = re.match(r"<!-- (\S+) -->", html)
+        url = match.group(1) if match else "https://example.com/"
+        pages.append((path.name, url, html))
+    if not pages:
+        pages.append(("synthetic", "https://example.com/careers", synthetic_page()))
+    return pages
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def set_engine(name):
+    link_extract.settings["engine"] = name
+
+
+def throughput(pages, processes, rounds=8):
+    link_extract.configure(processes=processes)
+    jobs = [(html.encode("utf-8"), url) for _, url, html in pages] * rounds
+    # Warm up the pool so process start-up is not timed
+    link_extract.extract_links_from_bytes(*jobs[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(
+            executor.map(lambda job: link_extract.extract_links_from_bytes(*job), jobs)
+        )
+    took = time.perf_counter() - start
+    link_extract.configure(processes=0)
+    return len(jobs) / took
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--record", nargs="+", metavar="URL")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--processes", metavar="N")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    engines = ["stdlib"] + (["lxml"] if link_extract.lxml is not None else [])
+    print(f"{'page':40} {'KiB':>6} {'bs4 ms':>8}", end="")
+    for engine in engines:
+        print(f" {engine + ' ms':>10} {'x':>5}", end="")
+    print()
+
+    differs = False
+    for name, url, html in load_pages():
+        reference = (bs4_hrefs(html), bs4_anchor_links(html, url))
+        baseline = best_of(
+            lambda: (bs4_hrefs(html), bs4_anchor_links(html, url)), args.repeat
+        )
+        print(f"{name[:40]:40} {len(html) / 1024:6.0f} {baseline * 1000:8.1f}", end="")
+
+        for engine in engines:
+            set_engine(engine)
+            result = (
+                link_extract.extract_hrefs(html),
+                link_extract.extract_anchor_links(html, url),
+            )
+            took = best_of(
+                lambda: (
+                    link_extract.extract_hrefs(html),
+                    link_extract.extract_anchor_links(html, url),
+                ),
+                args.repeat,
+            )
+            mark = "" if result == reference else "*"
+            differs = differs or bool(mark)
+            print(f" {took * 1000:10.1f} {baseline / took:4.1f}{mark or ' '}", end="")
+        print()
+    set_engine("auto")
+    if differs:
+        print("\n* output differs from BeautifulSoup on this page")
+
+    if args.processes:
+        processes = args.processes
+        if processes != "auto":
+            processes = int(processes)
+        pages = load_pages()
+        threads = throughput(pages, 0)
+        link_extract.configure(processes=processes)
+        count = link_extract.process_count()
+        pooled = throughput(pages, processes)
+        print(f"\n16 threads, in-process:  {threads:8.1f} pages/s")
+        print(
+            f"16 threads, {count} processes: {pooled:8.1f} pages/s ({pooled / threads:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    os.chdir(Path(__file__).resolve().parent.parent)
+    main()
@@ -0,0 +1,289 @@
+"""
+Offline benchmark of the crawl stages, from discovery to storage.
+
+    python benchmarks/bench_pipeline.py --sizes 10,100,1000,10000
+
+Every size runs against a local SiteServer with a FakeLLM in place of
+Gemini, so the numbers are repeatable and cost nothing. Each stage
+reports throughput, p50/p99 latency per item and tracemalloc peak
+memory. Pass --no-memory for timings without tracemalloc overhead.
+Save the results with --json and check a later run against them with
+--compare to catch regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import discovery  # noqa: E402
+import http_cache  # noqa: E402
+import http_client  # noqa: E402
+import journal  # noqa: E402
+import llm_cache  # noqa: E402
+import openings  # noqa: E402
+import pipeline  # noqa: E402
+import rate_limit  # noqa: E402
+import scrpr  # noqa: E402
+import storage  # noqa: E402
+import structured  # noqa: E402
+from fixtures import FakeLLM, SiteServer  # noqa: E402
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def isolate(directory, name):
+    """
+    Point every on-disk store at fresh files, so no stage or size is
+    helped by the caches another one filled.
+    """
+    directory = Path(directory)
+    http_cache.configure(path=str(directory / f"{name}_http.db"), ttl=0)
+    llm_cache.configure(path=str(directory / f"{name}_llm.db"))
+    journal.configure(path=str(directory / f"{name}_journal.db"))
+    storage.configure(path=str(directory / f"{name}_jobs.db"))
+
+
+class Bench:
+    def __init__(self, size, workers, memory):
+        self.size = size
+        self.workers = workers
+        self.memory = memory
+        self.results = []
+
+    def measure(self, stage, run):
+        """
+        Time run(), which returns the per-item latencies.
+        """
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            latencies, errors = run()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if self.memory else 0
+        if self.memory:
+            tracemalloc.stop()
+
+        result = {
+            "size": self.size,
+            "stage": stage,
+            "items": len(latencies),
+            "errors": errors,
+            "seconds": round(elapsed, 4),
+            "per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "peak_mib": round(peak / 2**20, 2),
+        }
+        self.results.append(result)
+        print(
+            f"{self.size:>6} {stage:24} {result['items']:>6} {result['errors']:>4}"
+            f" {result['per_s']:>10} {result['p50_ms']:>9} {result['p99_ms']:>9}"
+            f" {result['peak_mib']:>9}"
+        )
+        return result
+
+    def each(self, stage, function, items, workers=None):
+        """
+        Apply function to every item on a thread pool, timing each call.
+        """
+        workers = workers or self.workers
+
+        def run():
+            latencies = []
+            errors = []
+
+            def timed(item):
+                start = time.perf_counter()
+                try:
+                    function(item)
+                except Exception as e:
+                    errors.append(e)
+                latencies.append(time.perf_counter() - start)
+
+            if workers == 1:
+                for item in items:
+                    timed(item)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(timed, items))
+            return latencies, len(errors)
+
+        return self.measure(stage, run)
+
+
+def discover_all(domains, concurrency=50):
+    latencies = []
+    found = {}
+
+    async def run():
+        slots = asyncio.Semaphore(concurrency)
+        async with http_client.async_session(limit=200, limit_per_host=200) as session:
+
+            async def one(domain):
+                async with slots:
+                    start = time.perf_counter()
+                    found[domain] = await discovery.find_careers_page_async(
+                        session, domain
+                    )
+                    latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(one(domain) for domain in domains))
+
+    asyncio.run(run())
+    return latencies, found
+
+
+def bench_size(server, size, args, directory):
+    bench = Bench(size, args.workers, not args.no_memory)
+    isolate(directory, f"stages_{size}")
+    domains = [server.domain(index) for index in range(size)]
+
+    found = {}
+
+    def discover():
+        latencies, result = discover_all(domains)
+        found.update(result)
+        return latencies, sum(url == "Not Found" for url in result.values())
+
+    bench.measure("discover", discover)
+    companies = [
+        pipeline.Company(domain, url)
+        for domain, url in found.items()
+        if url != "Not Found"
+    ]
+
+    bench.each("rank", pipeline.rank, companies)
+    bench.each(
+        "get_highest_scored_link",
+        lambda company: openings.get_highest_scored_link(company.ranking),
+        companies,
+        workers=1,
+    )
+    bench.each("extract", pipeline.extract, companies)
+    companies = [company for company in companies if company.links is not None]
+    bench.each(
+        "filter_subdomain_links",
+        lambda company: openings.filter_subdomain_links(company.links, company.target),
+        companies,
+        workers=1,
+    )
+    if server.recorded:
+        bench.each(
+            "extract_links (recorded)",
+            openings.extract_links,
+            [f"{server.origin}/recorded/{index}" for index in range(size)],
+        )
+    bench.each("classify", pipeline.classify, companies)
+    bench.each("store", pipeline.store, companies, workers=1)
+    storage.get_store().flush()
+
+    # The whole pipeline, with its own per-stage worker counts
+    isolate(directory, f"pipeline_{size}")
+
+    def end_to_end():
+        latencies = []
+        store = pipeline.store
+
+        def timed_store(company):
+            result = store(company)
+            latencies.append(time.monotonic() - company.started)
+            return result
+
+        pipeline.store = timed_store
+        try:
+            asyncio.run(pipeline.run_pipeline((domain, None) for domain in domains))
+        finally:
+            pipeline.store = store
+        return latencies, size - len(latencies)
+
+    bench.measure("pipeline (end to end)", end_to_end)
+    return bench.results
+
+
+def compare(results, baseline_path, tolerance):
+    baseline = {
+        (row["size"], row["stage"]): row
+        for row in json.loads(Path(baseline_path).read_text())
+    }
+    regressions = []
+    for row in results:
+        before = baseline.get((row["size"], row["stage"]))
+        if (
+            before
+            and before["per_s"]
+            and row["per_s"] < before["per_s"] * (1 - tolerance)
+        ):
+            regressions.append(
+                f"{row['stage']} @ {row['size']}: {before['per_s']} -> {row['per_s']}/s"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.0, metavar="SECONDS")
+    parser.add_argument("--http-latency", type=float, default=0.0, metavar="SECONDS")
+    parser.add_argument("--replay", help="LLM responses saved by record_generate()")
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument(
+        "--structured", action="store_true", help="use JSON responses (structured.py)"
+    )
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--compare", help="results JSON of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    structured.configure(enabled=args.structured)
+    fake = FakeLLM(args.replay, args.llm_latency)
+    scrpr.generate = fake
+    openings.generate = fake
+    # Everything is served from one local host, so lift the politeness limits
+    rate_limit.configure(host_rate=1e9, host_burst=1e9)
+    http_client.configure(pool_maxsize=max(args.workers, 10) * 4)
+
+    print(
+        f"{'size':>6} {'stage':24} {'items':>6} {'err':>4} {'items/s':>10}"
+        f" {'p50 ms':>9} {'p99 ms':>9} {'peak MiB':>9}"
+    )
+    results = []
+    with SiteServer(latency=args.http_latency) as server, tempfile.TemporaryDirectory(
+        prefix="jobot-bench-"
+    ) as directory:
+        for size in [int(size) for size in args.sizes.split(",")]:
+            results.extend(bench_size(server, size, args, directory))
+        storage.configure()
+        print(
+            f"\nFake LLM calls: {fake.calls}, HTTP requests served: {server.requests}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Compare per-row Sheets writes with sheet_sink.SheetSink.
+
+    python benchmarks/bench_sheet_sink.py [--rows 500] [--latency 0.2]
+
+Both run against a FakeWorksheet with a fixed per-call latency, so the
+numbers show how long the caller (an agent step) waits per row and how
+many API calls each approach makes. --fail-every makes every Nth call
+fail to exercise the sink's retries; the sink must still deliver every
+row, in order.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sheet_sink  # noqa: E402
+from bench_pipeline import percentile  # noqa: E402
+from fixtures import FakeWorksheet  # noqa: E402
+
+
+def report(name, waits, elapsed, worksheet):
+    print(
+        f"{name:10} {percentile(waits, 0.5) * 1000:9.3f} {percentile(waits, 0.99) * 1000:9.3f}"
+        f" {elapsed:9.2f} {worksheet.calls:>6} {len(worksheet.rows):>6}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2, metavar="SECONDS")
+    parser.add_argument("--fail-every", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+    rows = [[f"https://example.com/jobs/{n}"] for n in range(args.rows)]
+
+    print(
+        f"{'writer':10} {'p50 ms':>9} {'p99 ms':>9} {'total s':>9} {'calls':>6} {'rows':>6}"
+    )
+    worksheet = FakeWorksheet(args.latency)
+    waits = []
+    start = time.perf_counter()
+    for row in rows:
+        began = time.perf_counter()
+        worksheet.append_row(row)
+        waits.append(time.perf_counter() - began)
+    report("append_row", waits, time.perf_counter() - start, worksheet)
+
+    worksheet = FakeWorksheet(args.latency, args.fail_every)
+    with tempfile.TemporaryDirectory(prefix="jobot-bench-") as directory:
+        sink = sheet_sink.SheetSink(
+            worksheet,
+            path=str(Path(directory) / "buffer.db"),
+            flush_interval=0.5,
+            backoff=0.1,
+        )
+        waits = []
+        start = time.perf_counter()
+        for row in rows:
+            began = time.perf_counter()
+            sink.append(row)
+            waits.append(time.perf_counter() - began)
+        sink.close()
+        report("SheetSink", waits, time.perf_counter() - start, worksheet)
+
+    if worksheet.rows != rows:
+        print(f"FAILED: the sink delivered {len(worksheet.rows)} of {len(rows)} rows")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Measure CLI and module startup time against the targets below.
+
+    python benchmarks/bench_startup.py [--repeat 10]
+
+Each case runs in a fresh interpreter. The time of a bare `python -c pass`
+is reported alongside so that slow machines can be told apart from slow
+imports. The script also fails if a module pulls in a heavy dependency
+at import time. Exits non-zero if any target is missed.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+
+# name -> (python code, seconds on top of a bare interpreter)
+cases = {
+    "jobot --help": (
+        "import sys, jobot; sys.argv = ['jobot', '--help']; jobot.main()",
+        0.05,
+    ),
+    "import scrpr": ("import scrpr", 0.3),
+    "import openings": ("import openings", 0.3),
+    "import pipeline": ("import pipeline", 0.3),
+    "import discovery": ("import discovery", 0.3),
+}
+
+# Only the commands that use these may import them
+heavy = ["google.genai", "selenium", "aiohttp", "browser_use", "bs4", "gspread"]
+
+
+def timed_run(code):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code], cwd=root, check=False, stdout=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def measure(code, repeat):
+    timings = sorted(timed_run(code) for _ in range(repeat))
+    return statistics.median(timings), timings[0]
+
+
+def heavy_imports(code):
+    probe = f"{code.split(';')[0]}; import sys; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=root, capture_output=True, text=True
+    )
+    loaded = set(result.stdout.split())
+    return [module for module in heavy if module in loaded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    bare, _ = measure("pass", args.repeat)
+    print(f"{'case':20} {'median ms':>10} {'min ms':>8} {'target ms':>10}")
+    print(f"{'python -c pass':20} {bare * 1000:10.0f}")
+
+    failed = False
+    for name, (code, budget) in cases.items():
+        median, best = measure(code, args.repeat)
+        target = bare + budget
+        loaded = heavy_imports(code)
+        ok = median <= target and not loaded
+        failed = failed or not ok
+        note = "" if ok else "  MISSED"
+        if loaded:
+            note += f" (imports {', '.join(loaded)})"
+        print(
+            f"{name:20} {median * 1000:10.0f} {best * 1000:8.0f} {target * 1000:10.0f}{note}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
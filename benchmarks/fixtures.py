@@ -0,0 +1,462 @@
+"""
+Offline stand-ins for the web and for Gemini, used by the benchmarks.
+
+SiteServer serves one synthetic company per path prefix (/c{N}/) and the
+pages recorded with bench_link_extract.py --record under /recorded/{N}.
+Recorded pages link to live sites, so only parsing benchmarks use them;
+the synthetic companies never send a request off the machine. It also
+mocks the Greenhouse, Lever, Ashby and SmartRecruiters feeds under
+/ats/{adapter name}/ and the Workday CXS endpoint under /wday/cxs/, for
+the ATS adapters' api_base hook. FakeLLM answers linkRanker,
+openPositions2 and nextCheck prompts deterministically, as text or as
+structured.py JSON, or replays responses recorded with record_generate().
+FakeWorksheet stands in for a Google Sheets worksheet.
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import prompts
+import structured
+
+pages_dir = Path(__file__).resolve().parent / "pages"
+
+jobs_per_page = 20
+
+noise_links = [
+    ("/about", "About us"),
+    ("/blog", "Blog"),
+    ("/press", "Press"),
+    ("/login", "Sign in"),
+    ("/privacy", "Privacy policy"),
+    ("https://twitter.com/example", "Twitter"),
+    ("https://www.linkedin.com/company/example", "LinkedIn"),
+    ("/static/app.css", "Styles"),
+]
+
+
+def page(title, links):
+    anchors = "\n".join(f'<li><a href="{href}">{text}</a></li>' for href, text in links)
+    return (
+        f"<html><head><title>{title}</title></head>"
+        f"<body><nav><ul>{anchors}</ul></nav></body></html>"
+    )
+
+
+class Company:
+    """
+    A deterministic synthetic company site rooted at {origin}/c{index}.
+
+    One company in four has its careers page at a path the discovery
+    probes miss, so the homepage fallback is exercised too.
+    """
+
+    def __init__(self, index, origin=""):
+        self.index = index
+        self.root = f"{origin}/c{index}"
+        rng = random.Random(index)
+        self.careers_path = "/careers" if index % 4 else "/work-here"
+        self.pages = rng.randint(1, 4)
+        self.noise = rng.sample(noise_links, rng.randint(3, len(noise_links)))
+
+    def homepage(self):
+        links = [(self.root + path, text) for path, text in self.noise]
+        # Relative, like many homepages; resolved against the company root
+        links.append((self.careers_path.lstrip("/"), "Careers"))
+        return page(f"Company {self.index}", links)
+
+    def careers(self):
+        links = [(self.root + path, text) for path, text in self.noise]
+        links.append((self.root + "/jobs?page=1", "Open positions"))
+        links.append((self.root + "/benefits", "Benefits"))
+        return page(f"Careers at Company {self.index}", links)
+
+    def listing(self, number):
+        links = [(self.root + path, text) for path, text in self.noise]
+        links += [
+            (f"{self.root}/jobs/{number}-{n}", f"Software Engineer {number}-{n}")
+            for n in range(jobs_per_page)
+        ]
+        if number < self.pages:
+            links.append((f"{self.root}/jobs?page={number + 1}", "Next"))
+        return page(f"Jobs at Company {self.index}", links)
+
+
+ats_jobs_per_board = 120
+
+
+def board_jobs(board):
+    """
+    The postings of a mock ATS board: (id, title, location) tuples.
+    """
+    rng = random.Random(board)
+    cities = ["Berlin", "London", "New York", "Remote"]
+    return [
+        (f"{board}-{n}", f"Software Engineer {n}", rng.choice(cities))
+        for n in range(ats_jobs_per_board)
+    ]
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Discovery cancels the probes it no longer needs mid-request
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def load_recorded_pages():
+    return [
+        path.read_text(encoding="utf-8", errors="replace")
+        for path in sorted(pages_dir.glob("*.html"))
+    ]
+
+
+class SiteServer:
+    """
+    Local HTTP server for the synthetic companies and mock ATS feeds.
+
+    Args:
+        latency (float): Seconds added to every response
+    """
+
+    route = re.compile(r"^/c(\d+)(/.*)?$")
+    recorded_route = re.compile(r"^/recorded/(\d+)$")
+    ats_routes = {
+        "greenhouse": re.compile(r"^/ats/greenhouse/v1/boards/([\w-]+)/jobs$"),
+        # Like the real API, EU boards (named eu-*) are only on the EU host
+        "lever": re.compile(r"^/ats/lever/v0/postings/((?!eu-)[\w-]+)$"),
+        "lever-eu": re.compile(r"^/ats/lever-eu/v0/postings/(eu-[\w-]+)$"),
+        "ashby": re.compile(r"^/ats/ashby/posting-api/job-board/([\w-]+)$"),
+        "smartrecruiters": re.compile(
+            r"^/ats/smartrecruiters/v1/companies/([\w-]+)/postings$"
+        ),
+    }
+    workday_route = re.compile(r"^/wday/cxs/([\w-]+)/([\w-]+)/jobs$")
+
+    def __init__(self, latency=0.0):
+        self.recorded = load_recorded_pages()
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.render(self.path)
+                if body is not None:
+                    self.respond(200, body, "text/html; charset=utf-8")
+                    return
+                data = server.ats_feed(self.path)
+                if data is None:
+                    self.respond(404, "", "text/plain")
+                else:
+                    self.respond(200, json.dumps(data), "application/json")
+
+            def do_POST(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                status, data = server.workday_jobs(self.path, payload)
+                self.respond(status, json.dumps(data), "application/json")
+
+            def respond(self, status, body, content_type):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = QuietServer(("127.0.0.1", 0), Handler)
+        self.origin = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def render(self, path):
+        parsed = urlparse(path)
+        match = self.recorded_route.match(parsed.path)
+        if match and self.recorded:
+            return self.recorded[int(match.group(1)) % len(self.recorded)]
+        match = self.route.match(parsed.path)
+        if not match:
+            return None
+        company = Company(int(match.group(1)), self.origin)
+        rest = (match.group(2) or "/").rstrip("/") or "/"
+        if rest == "/":
+            return company.homepage()
+        if rest == company.careers_path:
+            return company.careers()
+        if rest == "/jobs":
+            number = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            return company.listing(number) if number <= company.pages else None
+        return None
+
+    def ats_feed(self, path):
+        """
+        The JSON body of a mock ATS feed, in each vendor's format.
+
+        Returns:
+            The decoded body, or None for an unknown path
+        """
+        parsed = urlparse(path)
+        for name, route in self.ats_routes.items():
+            match = route.match(parsed.path)
+            if match:
+                break
+        else:
+            return None
+        board = match.group(1)
+        jobs = board_jobs(board)
+        if name == "greenhouse":
+            return {
+                "jobs": [
+                    {
+                        "id": job_id,
+                        "title": title,
+                        "absolute_url": f"https://boards.greenhouse.io/{board}/jobs/{job_id}",
+                        "location": {"name": city},
+                    }
+                    for job_id, title, city in jobs
+                ]
+            }
+        if name in ("lever", "lever-eu"):
+            host = "jobs.eu.lever.co" if name == "lever-eu" else "jobs.lever.co"
+            return [
+                {
+                    "id": job_id,
+                    "text": title,
+                    "hostedUrl": f"https://{host}/{board}/{job_id}",
+                    "categories": {"location": city},
+                }
+                for job_id, title, city in jobs
+            ]
+        if name == "ashby":
+            return {
+                "jobs": [
+                    {
+                        "title": title,
+                        "jobUrl": f"https://jobs.ashbyhq.com/{board}/{job_id}",
+                        "location": city,
+                    }
+                    for job_id, title, city in jobs
+                ]
+            }
+        query = parse_qs(parsed.query)
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", ["10"])[0])
+        return {
+            "totalFound": len(jobs),
+            "content": [
+                {"id": job_id, "name": title, "location": {"city": city}}
+                for job_id, title, city in jobs[offset : offset + limit]
+            ],
+        }
+
+    def workday_jobs(self, path, payload):
+        """
+        A page of the mock Workday CXS listing.
+
+        Like the real endpoint it refuses pages over workday.max_page_size
+        (20) and only reports the total on the first page.
+
+        Returns:
+            tuple: (HTTP status, decoded body)
+        """
+        match = self.workday_route.match(urlparse(path).path)
+        if not match:
+            return 404, {}
+        limit, offset = payload.get("limit", 20), payload.get("offset", 0)
+        if limit > 20:
+            return 400, {"errorCode": "HTTP_400", "message": "limit too large"}
+        jobs = board_jobs(f"{match.group(1)}-{match.group(2)}")
+        return 200, {
+            "total": len(jobs) if offset == 0 else 0,
+            "jobPostings": [
+                {
+                    "title": title,
+                    "externalPath": f"/job/{city}/{title.replace(' ', '-')}_{job_id}",
+                    "locationsText": city,
+                }
+                for job_id, title, city in jobs[offset : offset + limit]
+            ],
+        }
+
+    def domain(self, index):
+        return f"{self.origin}/c{index}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def prompt_key(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def record_generate(generate, path):
+    """
+    Wrap a real generate() so its responses are saved for FakeLLM replay.
+
+    Args:
+        generate (callable): e.g. scrpr.generate
+        path (str): JSON file of {sha256(prompt): response}
+
+    Returns:
+        callable: generate(prompt, schema=None) that records as it goes
+    """
+    lock = threading.Lock()
+    recorded = json.loads(Path(path).read_text()) if Path(path).exists() else {}
+
+    def recording(prompt, schema=None):
+        response = generate(prompt, schema=schema)
+        with lock:
+            recorded[prompt_key(prompt)] = response
+            Path(path).write_text(json.dumps(recorded))
+        return response
+
+    return recording
+
+
+class FakeLLM:
+    """
+    Deterministic generate(prompt, schema=None) for the repo's prompt templates.
+
+    Args:
+        replay (str): JSON file written by record_generate(); prompts found
+                      there get their recorded response
+        latency (float): Seconds to sleep per call, to model API latency
+    """
+
+    job_path = re.compile(r"/jobs/\d")
+    ranked_line = re.compile(r"^\d+\. (\S+) - (\d+)/100: (.*)$", re.M)
+    table_row = re.compile(r"^(\S+) \| (.*)$", re.M)
+
+    def __init__(self, replay=None, latency=0.0):
+        self.recorded = json.loads(Path(replay).read_text()) if replay else {}
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, prompt, schema=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        recorded = self.recorded.get(prompt_key(prompt))
+        if recorded is not None:
+            return recorded
+        if schema is not None:
+            return self.structured(prompt, schema)
+        return self.answer(prompt)
+
+    def answer(self, prompt):
+        if prompt.startswith(prompts.linkRanker):
+            return self.rank(prompt[len(prompts.linkRanker) :].split("\n"))
+        rows = self.table_row.findall(prompt)
+        if prompt.startswith(prompts.openPositions2.split("{URL_TEXT_PAIRS}")[0]):
+            jobs = [path for path, _ in rows if self.job_path.search(path)]
+            return "<job_position_links>\n{}\n</job_position_links>".format(
+                "\n".join(jobs)
+            )
+        if prompt.startswith(prompts.nextCheck.split("{URL_TEXT_PAIRS}")[0]):
+            for path, text in rows:
+                if text.strip().lower() == "next":
+                    return f"<analysis>found</analysis>\n<result>\n{path}\n</result>"
+            return "<result>\nNO_NEXT_PAGE\n</result>"
+        return ""
+
+    def structured(self, prompt, schema):
+        """
+        JSON answers for structured.py's schemas.
+        """
+        text = self.answer(prompt.replace(structured.json_instructions, ""))
+        if schema.__name__ == "LinkRanking":
+            links = [
+                {"url": url, "score": int(score), "reason": reason}
+                for url, score, reason in self.ranked_line.findall(text)
+            ]
+            return json.dumps({"links": links})
+        if schema.__name__ == "JobLinks":
+            lines = text.split("\n")[1:-1]
+            return json.dumps({"job_links": [line for line in lines if line]})
+        if schema.__name__ == "NextPage":
+            result = text.split("<result>")[-1].split("</result>")[0].strip()
+            next_url = None if result == "NO_NEXT_PAGE" else result
+            return json.dumps({"next_url": next_url})
+        return "{}"
+
+    @staticmethod
+    def rank(hrefs):
+        scored = []
+        for href in hrefs:
+            href = href.strip()
+            if not href:
+                continue
+            lowered = href.lower()
+            score = 0
+            if "jobs" in lowered or "positions" in lowered:
+                score = 95
+            elif "career" in lowered or "join" in lowered:
+                score = 80
+            if score:
+                scored.append((score, href))
+        scored.sort(key=lambda item: -item[0])
+        return "\n".join(
+            f"{rank}. {href} - {score}/100: likely job listings"
+            for rank, (score, href) in enumerate(scored[:5], 1)
+        )
+
+
+class FakeWorksheet:
+    """
+    Local stand-in for a gspread.Worksheet, for sheet_sink.SheetSink.
+
+    Args:
+        latency (float): Seconds per API call
+        fail_every (int): Every Nth call raises ConnectionError, 0 never
+    """
+
+    def __init__(self, latency=0.0, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.rows = []
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def call(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and calls % self.fail_every == 0:
+            raise ConnectionError("fake Sheets API failure")
+
+    def append_row(self, values):
+        self.call()
+        with self.lock:
+            self.rows.append(list(values))
+
+    def append_rows(self, values):
+        self.call()
+        with self.lock:
+            self.rows.extend(list(row) for row in values)
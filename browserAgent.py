@@ -5,30 +5,25 @@ import os
 import sys
 from pathlib import Path
 from typing import Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
-import gspread
-from gspread_dataframe import set_with_dataframe
-from oauth2client.service_account import ServiceAccountCredentials
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
 from pydantic import BaseModel, SecretStr
-from PyPDF2 import PdfReader
 
-from browser_use import ActionResult, Agent, Controller
-from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use import ActionResult, Controller
 from browser_use.browser.context import BrowserContext
 import requests
 
-# Validate required environment variables
-load_dotenv()
+import reader
+import sheet_sink
 
 logger = logging.getLogger(__name__)
 # full screen mode
 controller = Controller()
 
+# Buffered writer to the worksheet that save_url appends to, opened by run()
+sheet = None
+
 # NOTE: This is the path to your cv file
 CV = Path.cwd() / "Back End.pdf"
 
@@ -36,24 +31,23 @@ CV = Path.cwd() / "Back End.pdf"
 # 	raise FileNotFoundError(f'You need to set the path to your cv file in the CV variable. CV file not found at {CV}')
 
 
-def llm_friendly_content(url: str):
-    """
-    This function is used to format the content in a way that is friendly for LLMs.
-    It can be used to extract specific information from the content.
+def llm_friendly_content(url: str, html: Optional[str] = None):
     """
+    Return a page as compact Markdown for the LLM, without navigation,
+    banners and other boilerplate.
 
-    # Here you can implement your logic to format the content
-    # For example, you can use regex to extract specific information
+    Args:
+        url (str): The page URL
+        html (str): The page HTML if it was already fetched, e.g. by the
+                    browser; otherwise the page is downloaded
 
-    """
-    Sends a GET request to the specified URL and returns the text content of the response.
+    Returns:
+        str: The Markdown, or "" if the page could not be fetched
     """
     try:
-        jina = "https://r.jina.ai/" + url
-        response = requests.get(jina)
-        response.raise_for_status()  # Raise an HTTPError for bad responses
-        logger.info(f"Fetched text from URL {response.text}")
-        return response.text
+        if html is None:
+            return reader.read_url(url)
+        return reader.read_html(html, url)
     except requests.RequestException as e:
         logger.error(f"Failed to fetch text from URL {url}: {e}")
         return ""
@@ -91,6 +85,8 @@ def read_jobs():
 
 @controller.action("Read my cv for context to fill forms")
 def read_cv():
+    from PyPDF2 import PdfReader
+
     pdf = PdfReader(CV)
     text = ""
     for page in pdf.pages:
@@ -132,19 +128,16 @@ async def upload_cv(index: int, browser: BrowserContext):
 
 
 @controller.action("Save URL", param_model=Position)
-def save_url(params: Position):
+async def save_url(params: Position, browser: BrowserContext):
     logger.info(params.url)
-    parameters.append_row([params.url])
-    llm_friendly_content(params.url)
-
+    # Batched and sent from a background thread; the step only waits for
+    # the local SQLite commit, which runs off the event loop
+    await asyncio.to_thread(sheet.append, [params.url])
+    # Convert the page the browser already has instead of fetching it again
+    html = await browser.get_page_html()
+    content = await asyncio.to_thread(llm_friendly_content, params.url, html)
+    logger.info(f"Read {len(content)} characters from {params.url}")
 
-browser = Browser(
-    config=BrowserConfig(
-        disable_security=True,
-        # chrome_instance_path="/usr/bin/google-chrome"
-        # cdp_url="http://localhost:9222",
-    )
-)
 
 initial_actions = [
     {"open_tab": {"url": "https://www.jobright.ai/jobs/recommended"}},
@@ -152,6 +145,18 @@ initial_actions = [
 
 
 async def main():
+    from browser_use import Agent
+    from browser_use.browser.browser import Browser, BrowserConfig
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    browser = Browser(
+        config=BrowserConfig(
+            disable_security=True,
+            # chrome_instance_path="/usr/bin/google-chrome"
+            # cdp_url="http://localhost:9222",
+        )
+    )
+
     # ground_task = (
     # 	'You are a professional job finder. '
     # 	'1. Read my cv with read_cv'
@@ -197,21 +202,47 @@ async def main():
     await agent.run()
 
 
-if __name__ == "__main__":
+def open_sheet(credentials="secrets/credentials.json", name="job applications"):
+    """
+    Open the first worksheet of the Google Sheet that saved URLs go to.
+
+    Args:
+        credentials (str): Path to the service account key file
+        name (str): Title of the spreadsheet
+
+    Returns:
+        gspread.Worksheet: The worksheet
+    """
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
     scope = [
         "https://spreadsheets.google.com/feeds",
         "https://www.googleapis.com/auth/drive",
     ]
 
-    creds = ServiceAccountCredentials.from_json_keyfile_name(
-        "secrets/credentials.json", scope
-    )
+    creds = ServiceAccountCredentials.from_json_keyfile_name(credentials, scope)
 
     # Authenticate with Google
     client = gspread.authorize(creds)
-    jobslist = client.open("job applications")
-    parameters = jobslist.get_worksheet(0)
+    jobslist = client.open(name)
+    return jobslist.get_worksheet(0)
 
-    # Add a new row to the sheet
 
-    asyncio.run(main())
+def run():
+    """
+    Open the sheet and run the browser agent.
+    """
+    global sheet
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    sheet = sheet_sink.SheetSink(open_sheet())
+    try:
+        asyncio.run(main())
+    finally:
+        sheet.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,195 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from batch_rank import estimate_tokens
+
+# Query parameters that only track the visitor. ref, source and src are
+# left alone because some career sites carry job IDs in them.
+tracking_params = re.compile(
+    r"^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|_ga|_gl|referrer|gh_src|trk\w*)$",
+    re.IGNORECASE,
+)
+
+asset_link = re.compile(
+    r"\.(css|js|json|png|jpe?g|gif|svg|ico|webp|mp4|webm|woff2?|ttf|pdf|zip|xml)$"
+)
+auth_link = re.compile(
+    r"/(log-?in|log-?out|sign-?in|sign-?up|sign-?out|register|account|password|sso|auth)(/|$)"
+)
+social_host = re.compile(
+    r"(^|\.)(facebook|twitter|x|linkedin|instagram|youtube|tiktok|pinterest|glassdoor|t)\.(com|co)$"
+)
+# Navigation and footer boilerplate that is never a job posting. Only the
+# whole anchor text counts, so "Legal Counsel" or "Home Health Aide" stay.
+boilerplate_text = re.compile(
+    r"^(privacy( policy| notice)?|cookies?( policy| settings| preferences)?"
+    r"|terms( of (use|service))?|terms (&|and) conditions|legal( notice)?"
+    r"|accessibility( statement)?|sitemap|skip to (main )?content|back to top"
+    r"|home|menu)$",
+    re.IGNORECASE,
+)
+
+
+def is_route(fragment):
+    """
+    Check whether a URL fragment is a client-side route, not an anchor.
+    """
+    return fragment.startswith(("/", "!"))
+
+
+def canonicalize_url(url):
+    """
+    Canonicalize a URL so equivalent links compare equal.
+
+    Lowercases scheme and host, drops default ports, tracking query
+    parameters, a trailing slash and in-page anchors. Route fragments
+    (#/job/123, #!/job/123) are kept: single-page-app boards put the
+    posting there.
+
+    Args:
+        url (str): An absolute URL
+
+    Returns:
+        str: The canonical URL
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, netloc.rpartition(":")[2]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rpartition(":")[0]
+
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not tracking_params.match(key)
+        ]
+    )
+    fragment = parsed.fragment if is_route(parsed.fragment) else ""
+    return urlunparse((scheme, netloc, path, parsed.params, query, fragment))
+
+
+def is_noise(url, text=""):
+    """
+    Check whether a link can never be a job posting or a next page.
+
+    Args:
+        url (str): A canonical URL
+        text (str): The anchor text
+
+    Returns:
+        bool: True for asset, auth, social and boilerplate links
+    """
+    parsed = urlparse(url)
+    path = parsed.path.lower()
+    return bool(
+        parsed.scheme not in ("http", "https")
+        or asset_link.search(path)
+        or auth_link.search(path)
+        or social_host.search(parsed.netloc)
+        or boilerplate_text.match(text)
+    )
+
+
+def compact_links(links):
+    """
+    Canonicalize, dedupe and filter links from extract_links/filter_subdomain_links.
+
+    Args:
+        links (list): Dicts with "url" and "text" keys
+
+    Returns:
+        list: (url, text) tuples in page order, one per canonical URL
+    """
+    rows = {}
+    for link in links:
+        url = canonicalize_url(link["url"])
+        text = " ".join(link.get("text", "").split())
+        if text == "No text":
+            text = ""
+        if is_noise(url, text):
+            continue
+        # Keep the first occurrence, but prefer a descriptive anchor text
+        if url not in rows or (text and not rows[url]):
+            rows[url] = text
+    return list(rows.items())
+
+
+def encode_table(rows, base_url):
+    """
+    Encode links as a compact table with URLs relative to a common base.
+
+    Args:
+        rows (list): (url, text) tuples
+        base_url (str): Origin shared by most of the links
+
+    Returns:
+        str: One "path | text" row per link under a "base:" header
+    """
+    parsed = urlparse(base_url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    lines = [f"base: {origin}", "path | text"]
+    for url, text in rows:
+        if url.startswith(origin + "/"):
+            url = url[len(origin) :]
+        text = text.replace("|", "/") or "-"
+        lines.append(f"{url} | {text}")
+    return "\n".join(lines)
+
+
+def compact_prompt_inputs(links, base_url, template, token_budget=6000):
+    """
+    Turn a link list into one or more compact prompt inputs.
+
+    Args:
+        links (list): Dicts with "url" and "text" keys
+        base_url (str): The careers page the links came from
+        template (str): The prompt the inputs are formatted into
+        token_budget (int): Maximum estimated tokens per full prompt
+
+    Returns:
+        list: Table strings, each small enough for one LLM call
+    """
+    rows = compact_links(links)
+    budget = token_budget - estimate_tokens(template)
+
+    chunks = []
+    chunk, used = [], 0
+    for row in rows:
+        cost = estimate_tokens(f"{row[0]} | {row[1]}\n")
+        if chunk and used + cost > budget:
+            chunks.append(encode_table(chunk, base_url))
+            chunk, used = [], 0
+        chunk.append(row)
+        used += cost
+    if chunk:
+        chunks.append(encode_table(chunk, base_url))
+    return chunks
+
+
+def merge_links(link_lists, base_url):
+    """
+    Merge the links returned for several chunks.
+
+    Relative paths from the compact table are resolved against the base
+    and duplicates are dropped.
+
+    Args:
+        link_lists (list): One list of URL strings per chunk
+        base_url (str): The careers page the links came from
+
+    Returns:
+        list: Absolute URLs in first-seen order
+    """
+    merged = {}
+    for links in link_lists:
+        for link in links:
+            link = link.strip()
+            if not link.startswith(("http://", "https://", "/")):
+                continue
+            merged.setdefault(canonicalize_url(urljoin(base_url, link)), None)
+    return list(merged)
@@ -0,0 +1,176 @@
+import asyncio
+from urllib.parse import urlparse
+
+import http_client
+import link_extract
+import metrics
+import rate_limit
+
+# Common career page paths
+career_paths = [
+    "/careers",
+    "/careers/",
+    "/jobs",
+    "/jobs/",
+    "/about/careers",
+    "/company/careers",
+    "/en/careers",
+    "/employment",
+    "/work-with-us",
+]
+
+
+async def probe_url(session, url):
+    """
+    Request a single candidate URL.
+
+    Args:
+        session (aiohttp.ClientSession): Session used for the request
+        url (str): The candidate careers page URL
+
+    Returns:
+        str or None: The URL if it answered with 200, otherwise None
+    """
+    host = urlparse(url).hostname
+    bucket = rate_limit.for_host(host)
+    await bucket.acquire_async()
+    with metrics.timer("http_request_seconds", host=host):
+        response = await session.get(url, allow_redirects=True)
+    async with response:
+        metrics.increment("http_responses_total", host=host, status=response.status)
+        if response.status in (429, 503):
+            retry_after = response.headers.get("Retry-After")
+            bucket.backoff(rate_limit.parse_retry_after(retry_after))
+        else:
+            bucket.success()
+        if response.status == 200:
+            return url
+    return None
+
+
+async def scrape_homepage(session, domain):
+    """
+    Fallback: scrape the homepage for career-related links.
+
+    Args:
+        session (aiohttp.ClientSession): Session used for the request
+        domain (str): The company domain, including scheme
+
+    Returns:
+        str or None: The first career-looking link, or None
+    """
+    await rate_limit.for_host(urlparse(domain).hostname).acquire_async()
+    async with session.get(domain, allow_redirects=True) as response:
+        if response.status != 200:
+            return None
+        html = await response.text(errors="replace")
+
+    # Parse off the event loop, in the process pool if one is configured
+    return await asyncio.get_running_loop().run_in_executor(
+        link_extract.get_pool(), link_extract.find_career_link, html, domain
+    )
+
+
+async def find_careers_page_async(session, domain):
+    """
+    Probe every candidate career path of a domain at once.
+
+    The first probe that answers with 200 wins and the remaining probes
+    are cancelled. If none succeed the homepage is scraped instead.
+
+    Args:
+        session (aiohttp.ClientSession): Session used for the requests
+        domain (str): The company domain, including scheme
+
+    Returns:
+        str: The careers page URL, or "Not Found"
+    """
+    import aiohttp
+
+    urls = [domain.rstrip("/") + path for path in career_paths]
+    tasks = [asyncio.create_task(probe_url(session, url)) for url in urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                url = await next_done
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"[ERROR] {domain}: {e!r}")
+                continue
+            if url:
+                print(f"[FOUND] Careers page for {domain}: {url}")
+                return url
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        url = await scrape_homepage(session, domain)
+        if url:
+            print(f"[SCRAPED] Possible careers page for {domain}: {url}")
+            return url
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[ERROR] Failed to scrape {domain}: {e!r}")
+
+    print(f"[NOT FOUND] No careers page found for {domain}")
+    return "Not Found"
+
+
+async def discover_careers_pages(
+    domains,
+    max_connections=200,
+    per_host=4,
+    max_domains=50,
+    timeout=10,
+    on_result=None,
+):
+    """
+    Find careers pages for many domains concurrently.
+
+    Args:
+        domains (list): Company domains, including scheme
+        max_connections (int): Global limit on open connections
+        per_host (int): Limit on open connections to a single host
+        max_domains (int): Number of domains probed at the same time
+        timeout (int): Connect and read timeout in seconds
+        on_result (callable): Called with each domain's result as soon as
+                              it is known
+
+    Returns:
+        list: One {"Company Domain", "Careers Page URL"} dict per domain,
+              in input order
+    """
+    domain_slots = asyncio.Semaphore(max_domains)
+
+    async def worker(session, domain):
+        try:
+            url = domain if urlparse(domain).scheme else "https://" + domain
+            async with domain_slots:
+                careers_url = await find_careers_page_async(session, url)
+        except Exception as e:
+            # e.g. ValueError from a malformed row; only this domain fails
+            print(f"[ERROR] Discovery failed for {domain}: {e!r}")
+            careers_url = "Not Found"
+        result = {"Company Domain": domain, "Careers Page URL": careers_url}
+        if on_result:
+            on_result(result)
+        return result
+
+    async with http_client.async_session(
+        limit=max_connections, limit_per_host=per_host, timeout=timeout
+    ) as session:
+        return await asyncio.gather(*[worker(session, d) for d in domains])
+
+
+def run_discovery(domains, **kwargs):
+    """
+    Synchronous entry point for discover_careers_pages.
+
+    Args:
+        domains (list): Company domains, including scheme
+        **kwargs: Concurrency options passed to discover_careers_pages
+
+    Returns:
+        list: One {"Company Domain", "Careers Page URL"} dict per domain
+    """
+    return asyncio.run(discover_careers_pages(domains, **kwargs))
@@ -0,0 +1,162 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+# Shared settings for the browser pool. Change them with configure().
+settings = {
+    "size": 4,  # long-lived Chrome instances
+    "page_load_timeout": 30,  # seconds before driver.get() gives up
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def chrome_options():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return options
+
+
+class WebDriverPool:
+    """
+    Fixed-size pool of long-lived headless Chrome drivers.
+
+    Drivers are started on demand up to `size`, checked out by one caller
+    at a time, reset (cookies cleared, blank page) when returned and
+    replaced when they fail a health check.
+    """
+
+    def __init__(self, size=4, page_load_timeout=30):
+        self.size = size
+        self.page_load_timeout = page_load_timeout
+        self.idle = queue.Queue()
+        self.started = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _start(self):
+        driver = webdriver.Chrome(options=chrome_options())
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return driver
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        with self.lock:
+            self.started -= 1
+
+    @staticmethod
+    def is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def _acquire(self, timeout):
+        with self.lock:
+            can_start = self.idle.empty() and self.started < self.size
+            if can_start:
+                self.started += 1
+        if can_start:
+            try:
+                return self._start()
+            except Exception:
+                with self.lock:
+                    self.started -= 1
+                raise
+
+        driver = self.idle.get(timeout=timeout)
+        if self.is_healthy(driver):
+            return driver
+        print("Recycling crashed Chrome driver")
+        self._quit(driver)
+        return self._acquire(timeout)
+
+    def _release(self, driver):
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except WebDriverException:
+            self._quit(driver)
+            return
+        if self.closed:
+            self._quit(driver)
+        else:
+            self.idle.put(driver)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """
+        Borrow a driver for the duration of a with-block.
+
+        Args:
+            timeout (float): Seconds to wait for a free driver, forever if None
+
+        Yields:
+            webdriver.Chrome: A healthy driver on a blank page
+        """
+        driver = self._acquire(timeout)
+        try:
+            yield driver
+        finally:
+            # A crashed session is not handed to the next caller
+            if self.is_healthy(driver):
+                self._release(driver)
+            else:
+                self._quit(driver)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+
+
+def configure(**options):
+    """
+    Update the pool settings. The pool is rebuilt on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _pool
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown driver_pool settings: {sorted(unknown)}")
+
+    with _pool_lock:
+        settings.update(options)
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+
+def get_pool():
+    """
+    Return the shared driver pool, creating it on first use.
+
+    Returns:
+        WebDriverPool: The shared pool
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WebDriverPool(settings["size"], settings["page_load_timeout"])
+                atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,207 @@
+import re
+from urllib.parse import urljoin, urlparse
+
+import ats
+from compaction import social_host
+
+# Rankings whose top score reaches this are trusted without asking the LLM
+confidence_threshold = 85
+
+# Job board hosts of ATS vendors without an ats.py adapter. Only the
+# boards: the vendors' own sites (www.) are marketing pages.
+other_board_hosts = re.compile(
+    r"^((?!www\.)[\w-]+\.(icims|bamboohr|recruitee)\.com"
+    r"|jobs\.jobvite\.com|apply\.workable\.com)$"
+)
+job_subdomain = re.compile(r"^(jobs|careers?|join|work)\.")
+# Job aggregators list other companies' jobs, like the social_host sites
+aggregator_hosts = re.compile(
+    r"(^|\.)(indeed|ziprecruiter|monster|simplyhired|careerbuilder|wellfound"
+    r"|angel)\.(com|co)$"
+)
+# Second-level labels of country domains, e.g. example.co.uk
+country_slds = {"co", "com", "net", "org", "ac", "gov", "edu"}
+
+# (score, reason, pattern on path + query), highest priority first. Only
+# paths ending at the listing score above confidence_threshold; deeper
+# ones such as /jobs/124 or /careers/privacy-notice are single postings
+# or other pages.
+path_rules = [
+    (
+        90,
+        "direct job listing path",
+        re.compile(r"/(jobs?|careers?|employment)(/search)?(/|\.html?)?(\?|$)"),
+    ),
+    (
+        90,
+        "job search page",
+        re.compile(
+            r"/(job-?search|search-?jobs|open-?positions|openings|vacancies)"
+            r"(/|\.html?)?(\?|$)"
+        ),
+    ),
+    (
+        80,
+        "career information page",
+        re.compile(
+            r"(work-(at|with)-|life-at-|join-?us|recruit|hiring|/positions|talent)"
+        ),
+    ),
+    (70, "career related path", re.compile(r"(career|jobs?\b)")),
+    (55, "application page", re.compile(r"(apply|application)")),
+]
+
+# Links the linkRanker prompt tells the model to ignore
+ignore_rules = [
+    re.compile(r"^(mailto|tel|javascript):"),
+    re.compile(r"/(bag|shop|store|cart|checkout)(/|$)"),
+    re.compile(r"/(support|help|customer-?service)(/|$)"),
+    re.compile(
+        r"\.(css|js|json|png|jpe?g|gif|svg|ico|webp|mp4|webm|woff2?|ttf|pdf|xml)(\?|$)"
+    ),
+]
+
+
+def board_host(host):
+    """
+    Check whether a host serves a hosted job board, where every page is a
+    job listing.
+    """
+    return bool(
+        any(
+            adapter.host is not None and adapter.host.search(host)
+            for adapter in ats.adapters.values()
+        )
+        or other_board_hosts.search(host)
+    )
+
+
+def site_of(host):
+    """
+    Approximate the registrable domain of a host: jobs.acme.co.uk -> acme.co.uk
+    """
+    labels = host.split(":")[0].split(".")
+    keep = 3 if len(labels) > 2 and labels[-2] in country_slds else 2
+    return ".".join(labels[-keep:])
+
+
+def score_link(url, base_url=None):
+    """
+    Score how likely a URL is to list jobs, following the linkRanker rules.
+
+    Only links on the company's own site or on a hosted job board can
+    reach confidence_threshold; links to social sites and job aggregators
+    score 0.
+
+    Args:
+        url (str): An absolute URL
+        base_url (str): The company's page the link came from
+
+    Returns:
+        tuple: (score 0-100, brief reason)
+    """
+    lowered = url.lower()
+    if any(rule.search(lowered) for rule in ignore_rules):
+        return 0, "ignored"
+
+    parsed = urlparse(lowered)
+    path = parsed.path + ("?" + parsed.query if parsed.query else "")
+    host = parsed.netloc.split(":")[0]
+    if social_host.search(host) or aggregator_hosts.search(host):
+        return 0, "social or aggregator site"
+    own_site = base_url is not None and site_of(host) == site_of(
+        urlparse(base_url.lower()).netloc
+    )
+
+    if board_host(host):
+        score, reason = 95, "hosted job board"
+    elif job_subdomain.search(host):
+        score, reason = 92, "job portal subdomain"
+    else:
+        score, reason = 0, "no job indicators"
+        for rule_score, rule_reason, pattern in path_rules:
+            if pattern.search(path):
+                score, reason = rule_score, rule_reason
+                break
+        if not score:
+            return 0, reason
+
+    # Tie-breakers from the prompt: search pages over informational ones,
+    # department pages over general ones, simpler URLs over complex ones
+    if "search" in path:
+        score += 2
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    if len(segments) == 2 and re.match(r"careers?$", segments[0]):
+        score += 1
+    if len(segments) > 3 or len(parsed.query) > 40:
+        score -= 3
+    if not own_site and not board_host(host):
+        # Another company's site: leave the decision to the LLM
+        score = min(score, confidence_threshold - 1)
+        reason += " on another site"
+    return max(0, min(score, 99)), reason
+
+
+def rank_links(hrefs, base_url=None, top=5):
+    """
+    Rank hrefs by how likely they are to contain job listings.
+
+    Args:
+        hrefs (list): href values, as returned by scrpr.extract_hrefs
+        base_url (str): Page the hrefs came from, used to resolve relative links
+        top (int): Number of links to return
+
+    Returns:
+        list: Up to `top` (url, score, reason) tuples, highest score first
+    """
+    ranked = []
+    seen = set()
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith("#"):
+            continue
+        url = urljoin(base_url, href) if base_url else href
+        if url in seen:
+            continue
+        seen.add(url)
+
+        score, reason = score_link(url, base_url)
+        if score:
+            ranked.append((url, score, reason))
+
+    # Stable sort keeps page order for equal scores; shorter URLs win ties
+    ranked.sort(key=lambda item: (-item[1], len(item[0])))
+    return ranked[:top]
+
+
+def format_ranking(ranked):
+    """
+    Format a ranking like the linkRanker LLM output.
+
+    Args:
+        ranked (list): (url, score, reason) tuples
+
+    Returns:
+        str: "N. URL - score/100: reason" lines
+    """
+    return "\n".join(
+        f"{i}. {url} - {score}/100: {reason}"
+        for i, (url, score, reason) in enumerate(ranked, 1)
+    )
+
+
+def confident_ranking(hrefs, base_url=None):
+    """
+    Rank hrefs locally and return the result only if it is confident.
+
+    Args:
+        hrefs (list): href values from the careers page
+        base_url (str): Page the hrefs came from
+
+    Returns:
+        str or None: linkRanker formatted text, or None when the LLM is needed
+    """
+    ranked = rank_links(hrefs, base_url)
+    if ranked and ranked[0][1] >= confidence_threshold:
+        return format_ranking(ranked)
+    return None
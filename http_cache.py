@@ -0,0 +1,231 @@
+import sqlite3
+import threading
+import time
+
+import requests
+
+import http_client
+import metrics
+
+# Shared settings for the response cache. Change them with configure().
+settings = {
+    "path": "http_cache.db",
+    "ttl": 24 * 60 * 60,  # seconds a stored page is served without revalidating
+    "max_bytes": 512 * 1024 * 1024,  # total body size kept before LRU eviction
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class CachedResponse:
+    """
+    The subset of requests.Response used by the fetchers, backed by the cache.
+    """
+
+    def __init__(self, url, status_code, content, encoding=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache keyed by URL.
+
+    Fresh entries (younger than ttl) are served straight from disk. Stale
+    entries are revalidated with If-None-Match / If-Modified-Since so an
+    unchanged page costs a 304 instead of a full download. The least
+    recently used entries are evicted once bodies exceed max_bytes.
+    """
+
+    def __init__(self, path, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            encoding TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+        """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self.conn.commit()
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, encoding, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("body", "encoding", "etag", "last_modified", "fetched_at")
+        return dict(zip(keys, row))
+
+    def store(self, url, body, encoding, etag, last_modified):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """
+            INSERT OR REPLACE INTO responses
+                (url, body, encoding, etag, last_modified, fetched_at, accessed_at, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (url, body, encoding, etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, url, revalidated=False):
+        now = time.time()
+        with self.lock:
+            if revalidated:
+                self.conn.execute(
+                    "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                    (now, now, url),
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url)
+                )
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        stale = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE url = ?", stale)
+
+    def fetch(self, url, **kwargs):
+        """
+        Fetch a URL through the cache.
+
+        Args:
+            url (str): The URL to fetch
+            **kwargs: Passed to http_client.get
+
+        Returns:
+            CachedResponse: The cached or freshly downloaded response
+        """
+        entry = self.lookup(url)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            metrics.increment("cache_requests_total", cache="http", result="hit")
+            self.touch(url)
+            return CachedResponse(
+                url, 200, entry["body"], entry["encoding"], from_cache=True
+            )
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = http_client.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            metrics.increment(
+                "cache_requests_total", cache="http", result="revalidated"
+            )
+            self.touch(url, revalidated=True)
+            return CachedResponse(
+                url, 200, entry["body"], entry["encoding"], from_cache=True
+            )
+
+        metrics.increment("cache_requests_total", cache="http", result="miss")
+        if response.status_code == 200:
+            self.store(
+                url,
+                response.content,
+                response.encoding,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        return CachedResponse(
+            url, response.status_code, response.content, response.encoding
+        )
+
+
+def configure(**options):
+    """
+    Update the cache settings. The cache is reopened on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _cache
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown http_cache settings: {sorted(unknown)}")
+
+    with _cache_lock:
+        settings.update(options)
+        if _cache is not None:
+            _cache.conn.close()
+        _cache = None
+
+
+def get_cache():
+    """
+    Return the shared response cache, opening it on first use.
+
+    Returns:
+        ResponseCache: The shared cache
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    settings["path"], settings["ttl"], settings["max_bytes"]
+                )
+    return _cache
+
+
+def fetch(url, **kwargs):
+    """
+    Fetch a URL through the shared response cache.
+
+    Args:
+        url (str): The URL to fetch
+        **kwargs: Passed to http_client.get
+
+    Returns:
+        CachedResponse: The cached or freshly downloaded response
+    """
+    return get_cache().fetch(url, **kwargs)
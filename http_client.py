@@ -0,0 +1,187 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+import rate_limit
+
+try:
+    import brotli  # noqa: F401 - lets urllib3 and aiohttp decode "br"
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+# Shared settings for every fetcher. Change them with configure().
+settings = {
+    "timeout": 10,  # seconds, used when a call does not pass its own
+    "pool_connections": 100,  # number of per-host pools kept alive
+    "pool_maxsize": 10,  # keep-alive connections per host
+    "retries": 3,
+    "backoff_factor": 0.5,  # sleeps 0.5s, 1s, 2s, ... between retries
+    "status_forcelist": (429, 500, 502, 503, 504),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=settings["retries"],
+        backoff_factor=settings["backoff_factor"],
+        status_forcelist=settings["status_forcelist"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings["pool_connections"],
+        pool_maxsize=settings["pool_maxsize"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def configure(**options):
+    """
+    Update the shared client settings.
+
+    The pooled session is rebuilt on the next request so the new pool
+    sizes and retry policy take effect.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _session
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown http_client settings: {sorted(unknown)}")
+
+    with _session_lock:
+        settings.update(options)
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session():
+    """
+    Return the shared keep-alive session, creating it on first use.
+
+    Returns:
+        requests.Session: The pooled session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def request(method, url, **kwargs):
+    """
+    Send a request through the shared session.
+
+    Requests are paced by the per-host politeness bucket, which backs off
+    when the host answers 429/503.
+
+    Args:
+        method (str): The HTTP method
+        url (str): The URL to fetch
+        **kwargs: Passed to requests.Session.request; timeout defaults to
+                  settings["timeout"]
+
+    Returns:
+        requests.Response: The response
+    """
+    kwargs.setdefault("timeout", settings["timeout"])
+    host = urlparse(url).hostname
+    bucket = rate_limit.for_host(host)
+    with metrics.timer("rate_limit_wait_seconds", limiter="host"):
+        bucket.acquire()
+    with metrics.timer("http_request_seconds", host=host):
+        response = get_session().request(method, url, **kwargs)
+    metrics.increment("http_responses_total", host=host, status=response.status_code)
+    if response.status_code in (429, 503):
+        bucket.backoff(
+            rate_limit.parse_retry_after(response.headers.get("Retry-After"))
+        )
+    else:
+        bucket.success()
+    return response
+
+
+def get(url, **kwargs):
+    """
+    Send a GET request through the shared session.
+
+    Args:
+        url (str): The URL to fetch
+        **kwargs: Passed to request()
+
+    Returns:
+        requests.Response: The response
+    """
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """
+    Send a POST request through the shared session.
+
+    Args:
+        url (str): The URL to post to
+        **kwargs: Passed to request()
+
+    Returns:
+        requests.Response: The response
+    """
+    return request("POST", url, **kwargs)
+
+
+def async_session(limit=200, limit_per_host=None, timeout=None):
+    """
+    Create an aiohttp session with the shared headers and timeouts.
+
+    Args:
+        limit (int): Global limit on open connections
+        limit_per_host (int): Limit on open connections to a single host,
+                              defaults to settings["pool_maxsize"]
+        timeout (int): Connect and read timeout in seconds, defaults to
+                       settings["timeout"]
+
+    Returns:
+        aiohttp.ClientSession: A new session; the caller must close it
+    """
+    import aiohttp
+
+    if limit_per_host is None:
+        limit_per_host = settings["pool_maxsize"]
+    if timeout is None:
+        timeout = settings["timeout"]
+
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+    # Only count time spent on the socket, not time spent waiting for a
+    # free connection slot under the limits above.
+    client_timeout = aiohttp.ClientTimeout(
+        total=None, sock_connect=timeout, sock_read=timeout
+    )
+    return aiohttp.ClientSession(
+        connector=connector, timeout=client_timeout, headers=HEADERS
+    )
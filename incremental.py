@@ -0,0 +1,107 @@
+import hashlib
+from urllib.parse import urljoin
+
+import metrics
+import storage
+from compaction import canonicalize_url
+
+# Shared settings for incremental recrawls. Change them with configure().
+settings = {
+    "enabled": False,  # classify only links that changed since the last crawl
+}
+
+
+def configure(**options):
+    """
+    Update the incremental crawl settings.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown incremental settings: {sorted(unknown)}")
+    settings.update(options)
+
+
+def normalize_links(links, page_url):
+    """
+    Reduce a page's links to the parts that affect classification.
+
+    Args:
+        links (list): Link dicts with "url" and "text" keys
+        page_url (str): The page the links came from
+
+    Returns:
+        dict: Canonical absolute URL -> (whitespace-normalized text, link
+              dict), sorted by URL; the first text seen for a URL wins
+    """
+    normalized = {}
+    for link in links:
+        url = canonicalize_url(urljoin(page_url, link["url"]))
+        text = " ".join(link.get("text", "").split())
+        normalized.setdefault(url, (text, link))
+    return dict(sorted(normalized.items()))
+
+
+def fingerprint(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def page_fingerprint(normalized):
+    return fingerprint(*(f"{url}\t{text}" for url, (text, _) in normalized.items()))
+
+
+def classify_changed(links, page_url, classify):
+    """
+    Classify only the links of a page that are new or changed since the
+    last crawl, reusing the stored classification of the others.
+
+    An unchanged page (same link set fingerprint) costs no LLM call.
+
+    Args:
+        links (list): Link dicts of the page, already filtered
+        page_url (str): The page the links came from
+        classify (callable): classify(links, page_url) -> job URLs, called
+                             with the new and changed links only
+
+    Returns:
+        list: Canonical job posting URLs of the whole page
+    """
+    store = storage.get_store()
+    page = canonicalize_url(page_url)
+    normalized = normalize_links(links, page_url)
+    current = page_fingerprint(normalized)
+    known = store.link_classifications(page)
+
+    if store.page_fingerprint(page) == current:
+        metrics.increment("incremental_pages_total", result="unchanged")
+        return [url for url in normalized if known.get(url, (None, False))[1]]
+    metrics.increment("incremental_pages_total", result="changed")
+
+    prints = {url: fingerprint(url, text) for url, (text, _) in normalized.items()}
+    changed = [url for url in normalized if known.get(url, (None,))[0] != prints[url]]
+    metrics.increment("incremental_links_total", len(changed), result="classified")
+    metrics.increment(
+        "incremental_links_total", len(normalized) - len(changed), result="reused"
+    )
+
+    jobs = set()
+    if changed:
+        found = classify([normalized[url][1] for url in changed], page_url)
+        jobs = {canonicalize_url(urljoin(page_url, url)) for url in found}
+    store.save_page_crawl(
+        page,
+        current,
+        [(url, prints[url], url in jobs) for url in changed],
+        list(normalized),
+    )
+
+    changed = set(changed)
+    return [
+        url for url in normalized if (url in jobs if url in changed else known[url][1])
+    ]
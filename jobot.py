@@ -0,0 +1,196 @@
+"""
+jobot command line.
+
+    python jobot.py discover [--input career_pages_ds.csv] [--output career_pages.csv] [--fresh]
+    python jobot.py rank [--input career_pages_ds.csv] [--batch] [--fresh]
+    python jobot.py extract [--input job_links.csv] [--recrawl] [--fresh]
+    python jobot.py pipeline [--input career_pages_ds.csv] [--recrawl] [--fresh]
+    python jobot.py agent
+
+Global options: --metrics PATH writes a metrics dump at the end of the
+run, --metrics-port PORT serves live metrics while it runs. --structured
+asks the LLM for JSON answers that are validated item by item.
+--parse-processes N|auto parses fetched pages in N worker processes.
+
+The run journal remembers each company's finished stages, so a rerun
+resumes where the last one stopped and skips finished companies; --fresh
+forgets that progress and starts over.
+
+Only the standard library is imported at startup. Each command imports
+the modules it needs when it runs, so `--help` and short cron jobs do not
+pay for google.genai, selenium, aiohttp or browser_use.
+benchmarks/bench_startup.py checks the startup time targets.
+"""
+
+import argparse
+import sys
+
+
+def start_fresh(stages=None):
+    """
+    Forget the run journal's progress so every company is processed again.
+
+    Args:
+        stages (list): The stages the command runs; all stages if None
+    """
+    import journal
+
+    run_journal = journal.get_journal()
+    for stage in stages or [None]:
+        run_journal.reset(stage)
+
+
+def discover_command(args):
+    import scrpr
+
+    if args.fresh:
+        start_fresh(["discovered"])
+    domains = [row[0] for row in scrpr.read_csv_to_list(args.input)]
+    scrpr.discover_careers_pages(domains, csv_filename=args.output)
+
+
+def rank_command(args):
+    import scrpr
+
+    if args.fresh:
+        start_fresh(["ranked"])
+    if args.batch:
+        scrpr.main_batched(args.input)
+    else:
+        scrpr.main(args.input)
+
+
+def start_recrawl():
+    """
+    Revisit every company's listing, classifying only new or changed links.
+    """
+    import incremental
+    import journal
+
+    incremental.configure(enabled=True)
+    run_journal = journal.get_journal()
+    for stage in ("classified", "stored"):
+        run_journal.reset(stage)
+
+
+def extract_command(args):
+    import openings
+
+    if args.fresh:
+        start_fresh(["extracted", "classified", "stored"])
+    if args.recrawl:
+        start_recrawl()
+    openings.main(args.input)
+
+
+def pipeline_command(args):
+    import pipeline
+    import scrpr
+
+    if args.fresh:
+        start_fresh()
+    if args.recrawl:
+        start_recrawl()
+    rows = scrpr.read_csv_to_list(args.input)
+    pipeline.run((row[0], row[1] if len(row) > 1 else None) for row in rows)
+
+
+def agent_command(args):
+    import browserAgent
+
+    browserAgent.run()
+
+
+recrawl_help = "revisit stored companies, classify only new links, close vanished ones"
+fresh_help = "forget the run journal's progress and process every company again"
+
+
+def process_count(value):
+    return value if value == "auto" else int(value)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="jobot", description="Find job openings.")
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="write metrics here at the end of the run (.json or Prometheus text)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve live metrics on /metrics and /metrics.json",
+    )
+    parser.add_argument(
+        "--structured",
+        action="store_true",
+        help="request and validate JSON responses from the LLM",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=process_count,
+        metavar="N",
+        help='parse pages in N worker processes, "auto" for one per spare core',
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("discover", help="find companies' careers pages")
+    command.add_argument("--input", default="career_pages_ds.csv")
+    command.add_argument("--output", default="career_pages.csv")
+    command.add_argument("--fresh", action="store_true", help=fresh_help)
+    command.set_defaults(run=discover_command)
+
+    command = commands.add_parser("rank", help="rank careers page links")
+    command.add_argument("--input", default="career_pages_ds.csv")
+    command.add_argument(
+        "--batch", action="store_true", help="rank many companies per LLM call"
+    )
+    command.add_argument("--fresh", action="store_true", help=fresh_help)
+    command.set_defaults(run=rank_command)
+
+    command = commands.add_parser("extract", help="extract and store job links")
+    command.add_argument("--input", default="job_links.csv")
+    command.add_argument("--recrawl", action="store_true", help=recrawl_help)
+    command.add_argument("--fresh", action="store_true", help=fresh_help)
+    command.set_defaults(run=extract_command)
+
+    command = commands.add_parser(
+        "pipeline", help="discover, rank, extract and store in one streaming run"
+    )
+    command.add_argument("--input", default="career_pages_ds.csv")
+    command.add_argument("--recrawl", action="store_true", help=recrawl_help)
+    command.add_argument("--fresh", action="store_true", help=fresh_help)
+    command.set_defaults(run=pipeline_command)
+
+    command = commands.add_parser("agent", help="run the browser agent")
+    command.set_defaults(run=agent_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if args.metrics or args.metrics_port:
+        import metrics
+
+        metrics.configure(dump_path=args.metrics, port=args.metrics_port)
+        if args.metrics_port:
+            metrics.serve()
+    if args.structured:
+        import structured
+
+        structured.configure(enabled=True)
+    if args.parse_processes is not None:
+        import link_extract
+
+        link_extract.configure(processes=args.parse_processes)
+    args.run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import time
+
+# Pipeline stages, in the order a company goes through them
+stages = ["discovered", "ranked", "extracted", "classified", "stored"]
+
+# Shared settings for the run journal. Change them with configure().
+settings = {
+    "path": "run_journal.db",
+}
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+class RunJournal:
+    """
+    Per-company, per-stage progress of pipeline runs, stored in SQLite.
+
+    A stage is only marked done once its output has been written, so a
+    restarted run can skip completed work and retry failed or
+    interrupted items.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS run_journal (
+            company TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (company, stage)
+        )
+        """
+        )
+        self.conn.commit()
+
+    def _record(self, company, stage, status, result=None, error=None):
+        if stage not in stages:
+            raise ValueError(f"Unknown stage: {stage}")
+        with self.lock:
+            self.conn.execute(
+                """
+            INSERT INTO run_journal (company, stage, status, result, error, attempts, updated_at)
+            VALUES (?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT (company, stage) DO UPDATE SET
+                status = excluded.status,
+                result = excluded.result,
+                error = excluded.error,
+                attempts = attempts + 1,
+                updated_at = excluded.updated_at
+            """,
+                (company, stage, status, result, error, time.time()),
+            )
+            self.conn.commit()
+
+    def mark_done(self, company, stage, result=None):
+        """
+        Args:
+            company (str): Company key, usually its domain
+            stage (str): One of journal.stages
+            result (str): Optional stage output to reuse when resuming
+        """
+        self._record(company, stage, "done", result=result)
+
+    def mark_failed(self, company, stage, error):
+        """
+        Args:
+            company (str): Company key, usually its domain
+            stage (str): One of journal.stages
+            error: The exception or message that made the stage fail
+        """
+        self._record(company, stage, "failed", error=str(error))
+
+    def status(self, company, stage):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, result FROM run_journal WHERE company = ? AND stage = ?",
+                (company, stage),
+            ).fetchone()
+        return row
+
+    def is_done(self, company, stage):
+        row = self.status(company, stage)
+        return row is not None and row[0] == "done"
+
+    def result(self, company, stage):
+        """
+        Returns:
+            str or None: The stored output of a completed stage
+        """
+        row = self.status(company, stage)
+        if row is not None and row[0] == "done":
+            return row[1]
+        return None
+
+    def summary(self):
+        """
+        Returns:
+            dict: stage -> {status: count}
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT stage, status, COUNT(*) FROM run_journal GROUP BY stage, status"
+            ).fetchall()
+        counts = {}
+        for stage, status, count in rows:
+            counts.setdefault(stage, {})[status] = count
+        return counts
+
+    def reset(self, stage=None):
+        """
+        Forget progress so the next run starts over.
+
+        Args:
+            stage (str): Only forget this stage; all stages if None
+        """
+        with self.lock:
+            if stage is None:
+                self.conn.execute("DELETE FROM run_journal")
+            else:
+                self.conn.execute("DELETE FROM run_journal WHERE stage = ?", (stage,))
+            self.conn.commit()
+
+
+def configure(**options):
+    """
+    Update the journal settings. The journal is reopened on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _journal
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown journal settings: {sorted(unknown)}")
+
+    with _journal_lock:
+        settings.update(options)
+        if _journal is not None:
+            _journal.conn.close()
+        _journal = None
+
+
+def get_journal():
+    """
+    Return the shared run journal, opening it on first use.
+
+    Returns:
+        RunJournal: The shared journal
+    """
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = RunJournal(settings["path"])
+    return _journal
@@ -0,0 +1,293 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import metrics
+
+try:
+    import lxml.html
+    from lxml.etree import ParserError
+except ImportError:  # pure-Python fallback below
+    lxml = None
+
+# Shared settings for link extraction. Change them with configure().
+settings = {
+    "engine": "auto",  # "lxml" (C parser), "stdlib" (html.parser) or "auto"
+    # Parse in worker processes: 0 parses in the calling thread, "auto"
+    # uses one process per spare CPU core
+    "processes": 0,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def engine(name=None):
+    name = name or settings["engine"]
+    if name == "auto":
+        return "lxml" if lxml is not None else "stdlib"
+    return name
+
+
+def truncate_text(text):
+    """
+    Clean anchor text the way openings.extract_links always has.
+    """
+    text = text.strip()
+    if not text:
+        return "No text"
+    return text[:50] + ("..." if len(text) > 50 else "")
+
+
+class LinkParser(HTMLParser):
+    """
+    Streaming collector of href attributes, anchor text and the page title.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+        self.anchors = []  # [href, text parts]
+        self.open_anchors = []
+        self.title = None
+        self.in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        href = None
+        for name, value in attrs:
+            if name == "href" and value is not None:
+                href = value
+                self.hrefs.append(value)
+                break
+        if tag == "a":
+            anchor = [href, []]
+            self.open_anchors.append(anchor)
+            if href is not None:
+                self.anchors.append(anchor)
+        elif tag == "title" and self.title is None:
+            self.in_title = True
+            self.title = ""
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == "a":
+            self.open_anchors.pop()
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self.open_anchors:
+            self.open_anchors.pop()
+        elif tag == "title":
+            self.in_title = False
+
+    def handle_data(self, data):
+        for anchor in self.open_anchors:
+            anchor[1].append(data)
+        if self.in_title:
+            self.title += data
+
+
+def _parse_stdlib(html):
+    parser = LinkParser()
+    parser.feed(html)
+    parser.close()
+    anchors = [(href, "".join(parts)) for href, parts in parser.anchors]
+    return parser.hrefs, anchors, parser.title
+
+
+def _parse_lxml(html):
+    try:
+        doc = lxml.html.fromstring(html)
+    except ParserError:
+        return [], [], None
+    except ValueError:
+        # lxml rejects str input that carries an XML encoding declaration
+        return _parse_stdlib(html)
+    hrefs = [element.get("href") for element in doc.iter() if "href" in element.attrib]
+    anchors = [
+        (a.get("href"), a.text_content()) for a in doc.iter("a") if "href" in a.attrib
+    ]
+    title = doc.findtext(".//title")
+    return hrefs, anchors, title
+
+
+def parse(html, engine_name=None):
+    """
+    Collect links from an HTML document with the configured engine.
+
+    Args:
+        html (str): The page source
+        engine_name (str): Overrides settings["engine"]
+
+    Returns:
+        tuple: (every href value, (href, anchor text) pairs for <a> tags,
+                page title or None)
+    """
+    if not html or not html.strip():
+        return [], [], None
+    name = engine(engine_name)
+    with metrics.timer("parse_seconds", engine=name):
+        if name == "lxml":
+            return _parse_lxml(html)
+        return _parse_stdlib(html)
+
+
+def extract_hrefs(html):
+    """
+    Return every href attribute in a page, like soup.find_all(href=True).
+
+    Args:
+        html (str): The page source
+
+    Returns:
+        list: href values in document order
+    """
+    return parse(html)[0]
+
+
+def extract_anchor_links(html, url, engine_name=None):
+    """
+    Return the <a> links of a page in the format of openings.extract_links.
+
+    Args:
+        html (str): The page source
+        url (str): The page URL, used to resolve relative links
+        engine_name (str): Overrides settings["engine"]
+
+    Returns:
+        tuple: (page title or None, list of {"url", "text"} dicts)
+    """
+    _, anchors, title = parse(html, engine_name)
+    base_url = "{0.scheme}://{0.netloc}".format(urlparse(url))
+
+    links = []
+    for href, text in anchors:
+        # Skip javascript and in-page anchor links; #/ and #! are app routes
+        if href.startswith("javascript:") or (
+            href.startswith("#") and not href.startswith(("#/", "#!"))
+        ):
+            continue
+
+        # Convert relative URLs to absolute URLs; routes belong to the page
+        if href.startswith("#"):
+            href = urljoin(url, href)
+        elif not href.startswith(("http://", "https://")):
+            href = urljoin(base_url, href)
+
+        links.append({"url": href, "text": truncate_text(text)})
+    return title, links
+
+
+def find_career_link(html, domain):
+    """
+    Find the first career-related link on a homepage.
+
+    Args:
+        html (str): The homepage source
+        domain (str): The company domain, including scheme
+
+    Returns:
+        str or None: The careers page URL
+    """
+    for href, _ in parse(html)[1]:
+        href = href.lower()
+        if "career" in href or "job" in href or "work" in href:
+            if href.startswith("http"):
+                return href
+            return domain.rstrip("/") + "/" + href.lstrip("/")
+    return None
+
+
+def parse_document(content, url, encoding=None, engine_name=None):
+    """
+    Decode a response body and extract its links. Runs in worker processes.
+
+    Bytes go in and plain tuples come out so that little has to be
+    pickled between processes.
+
+    Args:
+        content (bytes): The raw response body
+        url (str): The page URL, used to resolve relative links
+        encoding (str): The response encoding, utf-8 if None
+        engine_name (str): The parsing engine, see settings["engine"]. Worker
+                           processes do not see the parent's settings, so
+                           the caller passes its own.
+
+    Returns:
+        tuple: (page title or None, list of (url, text) tuples)
+    """
+    html = content.decode(encoding or "utf-8", errors="replace")
+    title, links = extract_anchor_links(html, url, engine_name)
+    return title, [(link["url"], link["text"]) for link in links]
+
+
+def process_count():
+    processes = settings["processes"]
+    if processes == "auto":
+        # Leave one core to the process doing the network I/O
+        return max((os.cpu_count() or 1) - 1, 1)
+    return int(processes or 0)
+
+
+def configure(**options):
+    """
+    Update the link extraction settings. The process pool is rebuilt on
+    next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _pool
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown link_extract settings: {sorted(unknown)}")
+
+    with _pool_lock:
+        settings.update(options)
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def get_pool():
+    """
+    Return the shared parsing process pool, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor or None: None when parsing in-process
+    """
+    global _pool
+    if _pool is None and process_count() > 0:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=process_count())
+                atexit.register(_pool.shutdown, cancel_futures=True)
+    return _pool
+
+
+def _as_dicts(parsed):
+    title, links = parsed
+    return title, [{"url": href, "text": text} for href, text in links]
+
+
+def extract_links_from_bytes(content, url, encoding=None):
+    """
+    Like extract_anchor_links, but takes the raw body and parses it in the
+    process pool when one is configured.
+
+    Args:
+        content (bytes): The raw response body
+        url (str): The page URL, used to resolve relative links
+        encoding (str): The response encoding, utf-8 if None
+
+    Returns:
+        tuple: (page title or None, list of {"url", "text"} dicts)
+    """
+    pool = get_pool()
+    if pool is None:
+        return _as_dicts(parse_document(content, url, encoding, settings["engine"]))
+    with metrics.timer("parse_seconds", engine="process_pool"):
+        future = pool.submit(parse_document, content, url, encoding, settings["engine"])
+        return _as_dicts(future.result())
@@ -0,0 +1,261 @@
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+
+import llm_cache
+import metrics
+import rate_limit
+from batch_rank import estimate_tokens
+
+# Shared settings for the LLM gateway. Change them with configure().
+settings = {
+    "concurrency": 16,  # most requests in flight at once
+    "min_concurrency": 1,  # adaptive backoff never drops below this
+    "timeout": 60.0,  # seconds before one attempt is abandoned
+    # Seconds before a duplicate of a slow request is sent, None to disable.
+    # Hedges spend quota, so keep this well above the usual latency.
+    "hedge_after": 20.0,
+    "temperature": 1,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+}
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+class AdaptiveLimit:
+    """
+    Cap on in-flight requests with AIMD adjustment.
+
+    backoff() halves the cap after a 429 or 5xx; every success()
+    raises it by 1/cap, so by about one per full round of requests.
+    Only used from the gateway's event loop.
+    """
+
+    def __init__(self, maximum, minimum):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self.condition:
+            await self.condition.wait_for(self.has_room)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def has_room(self):
+        return self.in_flight < int(self.limit)
+
+    def backoff(self):
+        self.limit = max(self.minimum, self.limit / 2)
+
+    def success(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class Gateway:
+    """
+    One Gemini client and event loop shared by every caller.
+
+    The loop runs in a daemon thread, so synchronous code (the scripts'
+    worker threads) and other event loops can all submit requests to it
+    and share one in-flight limit.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.limit = AdaptiveLimit(settings["concurrency"], settings["min_concurrency"])
+        self.client = None
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="llm-gateway", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, prompt, schema=None):
+        """
+        Returns:
+            concurrent.futures.Future: The response text of generate()
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.generate(prompt, schema), self.loop
+        )
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def request(self, prompt, schema):
+        # google.genai takes about a second to import, so only LLM calls pay for it
+        from google import genai
+        from google.genai import types
+
+        if self.client is None:
+            self.client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+        config = types.GenerateContentConfig(
+            temperature=settings["temperature"],
+            top_p=settings["top_p"],
+            top_k=settings["top_k"],
+            max_output_tokens=settings["max_output_tokens"],
+            response_mime_type="text/plain",
+        )
+        # Structured calls (structured.py) get JSON matching the schema
+        if schema is not None:
+            config.response_mime_type = "application/json"
+            config.response_schema = schema
+        response = await self.client.aio.models.generate_content(
+            model=llm_cache.settings["model"],
+            contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+            config=config,
+        )
+        return response.text
+
+    async def attempt(self, prompt, schema, tokens, sent=None):
+        with metrics.timer("rate_limit_wait_seconds", limiter="gemini"):
+            await rate_limit.gemini().acquire_async(tokens)
+        async with self.limit.slot():
+            if sent is not None:
+                sent.set()
+            return await asyncio.wait_for(
+                self.request(prompt, schema), settings["timeout"]
+            )
+
+    async def hedged(self, prompt, schema, tokens):
+        """
+        Send the request, and a duplicate if the first has been in flight
+        for settings["hedge_after"] seconds while a slot is free. The first
+        success wins.
+        """
+        sent = asyncio.Event()
+        tasks = [asyncio.ensure_future(self.attempt(prompt, schema, tokens, sent))]
+        try:
+            if settings["hedge_after"] is not None:
+                # Time spent queued for a slot does not count as slow
+                waiting = asyncio.ensure_future(sent.wait())
+                await asyncio.wait(
+                    [tasks[0], waiting], return_when=asyncio.FIRST_COMPLETED
+                )
+                waiting.cancel()
+                if not tasks[0].done():
+                    await asyncio.wait(tasks, timeout=settings["hedge_after"])
+                if not tasks[0].done() and self.limit.has_room():
+                    metrics.increment("llm_hedges_total")
+                    tasks.append(
+                        asyncio.ensure_future(self.attempt(prompt, schema, tokens))
+                    )
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if task.done():
+                    # The losing attempt's error is not worth reporting
+                    task.cancelled() or task.exception()
+                else:
+                    task.cancel()
+
+    async def generate(self, prompt, schema=None):
+        """
+        Run one LLM call within the Gemini quotas and the in-flight limit.
+
+        429 and 5xx errors back off both the rate limiter (honoring the
+        server's retry delay) and the in-flight limit. They and timeouts
+        are retried.
+        """
+        tokens = estimate_tokens(prompt)
+        limiter = rate_limit.gemini()
+        retries = rate_limit.settings["llm_retries"]
+        for attempt in range(retries + 1):
+            try:
+                result = await self.hedged(prompt, schema, tokens)
+            except asyncio.TimeoutError:
+                if attempt == retries:
+                    raise
+                print(f"LLM call timed out after {settings['timeout']}s, retrying")
+                metrics.increment("llm_retries_total", code="timeout")
+                continue
+            except Exception as e:
+                if not rate_limit.is_retryable(e) or attempt == retries:
+                    raise
+                print(f"LLM API returned {e.code}, backing off")
+                metrics.increment("llm_retries_total", code=e.code)
+                limiter.backoff(rate_limit.retry_delay(e))
+                self.limit.backoff()
+                continue
+            limiter.success()
+            self.limit.success()
+            return result
+
+
+def configure(**options):
+    """
+    Update the gateway settings. The gateway is restarted on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _gateway
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown llm settings: {sorted(unknown)}")
+
+    with _gateway_lock:
+        settings.update(options)
+        if _gateway is not None:
+            _gateway.close()
+        _gateway = None
+
+
+def get_gateway():
+    """
+    Return the shared gateway, starting it on first use.
+
+    Returns:
+        Gateway: The shared gateway
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = Gateway()
+    return _gateway
+
+
+def generate(prompt, schema=None):
+    """
+    Send a prompt to Gemini and wait for the answer.
+
+    Safe to call from many threads at once; the requests are in flight
+    together, up to settings["concurrency"].
+
+    Args:
+        prompt (str): The full prompt
+        schema: Optional pydantic model; the answer is then JSON for it
+
+    Returns:
+        str: The response text
+    """
+    return get_gateway().submit(prompt, schema).result()
+
+
+async def generate_async(prompt, schema=None):
+    """
+    Like generate(), for callers running their own event loop.
+    """
+    return await asyncio.wrap_future(get_gateway().submit(prompt, schema))
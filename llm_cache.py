@@ -0,0 +1,259 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+import metrics
+
+# Shared settings for the LLM response cache. Change them with configure().
+settings = {
+    "path": "llm_cache.db",
+    "model": "gemini-2.0-flash",  # model the llm gateway calls
+    "ttl": 7 * 24 * 60 * 60,  # seconds a cached response stays valid
+    "max_entries": 100_000,  # least recently used entries are evicted past this
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def normalize(payload):
+    """
+    Normalize prompt input so formatting noise does not change the cache key.
+
+    Args:
+        payload: The prompt input; non-strings use their repr, which is
+                 what str.format puts into the prompt
+
+    Returns:
+        str: The input with surrounding and per-line whitespace stripped
+    """
+    text = payload if isinstance(payload, str) else repr(payload)
+    lines = (line.strip() for line in text.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def template_name(template):
+    """
+    Name a prompt template for metrics labels.
+
+    Args:
+        template (str): A prompt from prompts.py
+
+    Returns:
+        str: The prompts.py attribute name, e.g. "linkRanker", or "other".
+             Templates with extra instructions appended (structured.py)
+             are named after the prompt they start with.
+    """
+    import prompts
+
+    best, best_length = "other", 0
+    for name, value in vars(prompts).items():
+        if name.startswith("_") or not isinstance(value, str) or not value:
+            continue
+        if value is template or value == template:
+            return name
+        if len(value) > best_length and template.startswith(value):
+            best, best_length = name, len(value)
+    return best
+
+
+def render_prompt(template, payload):
+    """
+    Build the prompt the same way the scripts do.
+
+    Templates with a {URL_TEXT_PAIRS} placeholder are formatted, the
+    others (linkRanker) have the input appended.
+
+    Args:
+        template (str): A prompt from prompts.py
+        payload: The prompt input
+
+    Returns:
+        str: The full prompt
+    """
+    if "{URL_TEXT_PAIRS}" in template:
+        return template.format(URL_TEXT_PAIRS=payload)
+    return template + payload
+
+
+class LLMCache:
+    """
+    Content-addressed SQLite cache of LLM responses.
+
+    Entries are keyed on a hash of model, prompt template and normalized
+    input, expire after ttl seconds and are evicted least recently used
+    first once there are more than max_entries.
+    """
+
+    def __init__(self, path, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS llm_responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+        """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_accessed ON llm_responses (accessed_at)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(model, template, payload):
+        digest = hashlib.sha256()
+        for part in (model, template, normalize(payload)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """
+            INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+                (key, model, response, now, now),
+            )
+            (count,) = self.conn.execute(
+                "SELECT COUNT(*) FROM llm_responses"
+            ).fetchone()
+            if count > self.max_entries:
+                self.conn.execute(
+                    """
+                DELETE FROM llm_responses WHERE key IN (
+                    SELECT key FROM llm_responses ORDER BY accessed_at LIMIT ?
+                )
+                """,
+                    (count - self.max_entries,),
+                )
+            self.conn.commit()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit and miss counters for this process, plus the hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def configure(**options):
+    """
+    Update the cache settings. The cache is reopened on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _cache
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown llm_cache settings: {sorted(unknown)}")
+
+    with _cache_lock:
+        settings.update(options)
+        if _cache is not None:
+            _cache.conn.close()
+        _cache = None
+
+
+def get_cache():
+    """
+    Return the shared LLM cache, opening it on first use.
+
+    Returns:
+        LLMCache: The shared cache
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    settings["path"], settings["ttl"], settings["max_entries"]
+                )
+    return _cache
+
+
+def cached_generate(generate, template, payload, model=None, validate=None):
+    """
+    Call generate() for a prompt template and input, reusing cached answers.
+
+    Args:
+        generate (callable): The generate(prompt) function to call on a miss
+        template (str): A prompt from prompts.py
+        payload: The prompt input
+        model (str): Model name used in the cache key, defaults to
+                     settings["model"]
+        validate (callable): validate(response) -> bool. Responses that fail
+                             are neither cached nor served from the cache.
+
+    Returns:
+        str: The LLM response text
+    """
+    from batch_rank import estimate_tokens
+
+    model = model or settings["model"]
+    name = template_name(template)
+    cache = get_cache()
+    key = cache.key(model, template, payload)
+
+    response = cache.get(key)
+    if response is not None and (validate is None or validate(response)):
+        metrics.increment("cache_requests_total", cache="llm", result="hit")
+        return response
+    metrics.increment("cache_requests_total", cache="llm", result="miss")
+
+    prompt = render_prompt(template, payload)
+    with metrics.timer("llm_call_seconds", template=name):
+        response = generate(prompt)
+    # Token counts are estimates (chars / 4), generate() only returns text
+    metrics.increment("llm_calls_total", template=name)
+    metrics.increment(
+        "llm_tokens_total", estimate_tokens(prompt), template=name, kind="input"
+    )
+    metrics.increment(
+        "llm_tokens_total",
+        estimate_tokens(response or ""),
+        template=name,
+        kind="output",
+    )
+    if response and (validate is None or validate(response)):
+        cache.put(key, model, response)
+    return response
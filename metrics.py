@@ -0,0 +1,302 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Shared settings for metrics collection. Change them with configure().
+settings = {
+    "enabled": True,
+    "dump_path": None,  # written by dump(); .json for JSON, Prometheus text otherwise
+    "port": None,  # serve() exposes /metrics and /metrics.json on this port
+}
+
+# Upper bounds (seconds) of the latency histogram buckets
+buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_registry = None
+_registry_lock = threading.Lock()
+_server = None
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(buckets) and value > buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by interpolating inside its bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = buckets[index - 1] if index else 0.0
+                upper = buckets[index] if index < len(buckets) else buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return buckets[-1]
+
+
+class Registry:
+    """
+    Counters and latency histograms keyed by name and labels.
+
+    Labels are keyword arguments, e.g. host="example.com" or
+    template="linkRanker". All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: JSON-serializable counters, histogram summaries and cache
+                  hit rates
+        """
+        with self.lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "mean": round(h.sum / h.count, 6) if h.count else 0.0,
+                    "p50": round(h.quantile(0.5), 6),
+                    "p99": round(h.quantile(0.99), 6),
+                }
+                for (name, labels), h in sorted(self.histograms.items())
+            ]
+
+        lookups = {}
+        for counter in counters:
+            if counter["name"] == "cache_requests_total":
+                cache = lookups.setdefault(counter["labels"]["cache"], {})
+                result = counter["labels"]["result"]
+                cache[result] = cache.get(result, 0) + counter["value"]
+        hit_rates = {
+            cache: (total - results.get("miss", 0)) / total
+            for cache, results in lookups.items()
+            if (total := sum(results.values()))
+        }
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "counters": counters,
+            "histograms": histograms,
+            "cache_hit_rate": hit_rates,
+        }
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format
+        """
+
+        def render(name, labels, value, extra=()):
+            pairs = [
+                (k, v.replace("\\", "\\\\").replace('"', '\\"'))
+                for k, v in list(labels) + list(extra)
+            ]
+            if not pairs:
+                return f"jobot_{name} {value}"
+            rendered = ",".join(f'{k}="{v}"' for k, v in pairs)
+            return f"jobot_{name}{{{rendered}}} {value}"
+
+        lines = []
+        with self.lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE jobot_{name} counter")
+                lines.append(render(name, labels, value))
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE jobot_{name} histogram")
+                cumulative = 0
+                for bound, count in zip(buckets + ("+Inf",), h.counts):
+                    cumulative += count
+                    lines.append(
+                        render(
+                            f"{name}_bucket", labels, cumulative, [("le", str(bound))]
+                        )
+                    )
+                lines.append(render(f"{name}_sum", labels, round(h.sum, 6)))
+                lines.append(render(f"{name}_count", labels, h.count))
+        return "\n".join(lines) + "\n"
+
+
+def configure(**options):
+    """
+    Update the metrics settings. Collected metrics are kept.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown metrics settings: {sorted(unknown)}")
+    settings.update(options)
+
+
+def get_registry():
+    """
+    Return the shared registry, creating it on first use.
+
+    Returns:
+        Registry: The shared registry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = Registry()
+    return _registry
+
+
+def reset():
+    """
+    Drop all collected metrics.
+    """
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def increment(name, value=1, **labels):
+    """
+    Add to a counter, e.g. increment("cache_requests_total", cache="llm", result="hit").
+    """
+    if settings["enabled"]:
+        get_registry().increment(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """
+    Record a value, in seconds, in a latency histogram.
+    """
+    if settings["enabled"]:
+        get_registry().observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """
+    Time a with-block into the histogram `name`.
+
+    Exceptions are counted in `errors_total` with the histogram name as
+    the `metric` label, then re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        increment("errors_total", metric=name, error=type(e).__name__, **labels)
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def dump(path=None):
+    """
+    Write all metrics to a file.
+
+    Args:
+        path (str): Destination, defaults to settings["dump_path"]. Paths
+                    ending in .json get JSON, others Prometheus text.
+
+    Returns:
+        str or None: The path written, or None if no path is set
+    """
+    path = path or settings["dump_path"]
+    if not path:
+        return None
+    registry = get_registry()
+    with open(path, "w", encoding="utf-8") as file:
+        if path.endswith(".json"):
+            json.dump(registry.snapshot(), file, indent=2)
+        else:
+            file.write(registry.to_prometheus())
+    print(f"Metrics written to {path}")
+    return path
+
+
+def serve(port=None):
+    """
+    Serve live metrics over HTTP from a daemon thread: Prometheus text on
+    /metrics and JSON on /metrics.json.
+
+    Args:
+        port (int): Port to listen on, defaults to settings["port"]
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            registry = get_registry()
+            if self.path == "/metrics":
+                body = registry.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    if _server is None:
+        if port is None:
+            port = settings["port"]
+        _server = ThreadingHTTPServer(("", port), Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        print(f"Serving metrics on :{_server.server_address[1]}/metrics")
+    return _server
@@ -1,27 +1,21 @@
-import time
-import requests
-import json
-from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin, urlparse
 import csv
 import prompts
-from dotenv import load_dotenv
-from google.genai import types
-from google import genai
-import os
-from pprint import pprint
+import http_cache
+import incremental
+import llm
+import llm_cache
+import compaction
+import journal
+import metrics
+import storage
+import pagination
+import ats
+import link_extract
 import xml.etree.ElementTree as ET
 import sqlite3  # Added SQLite import
 import ast
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-
-load_dotenv()
 
 
 def extract_domain(url):
@@ -41,83 +35,76 @@ def extract_domain(url):
     return None
 
 
-def extract_workday_job_links(url):
+# Common Workday job link selectors, most specific first
+workday_selectors = [
+    "a[data-automation-id='jobTitle']",  # Most common
+    ".jobTitle a",
+    ".job-link",
+    "[data-automation-id='jobSearchResultsList'] a",
+    ".WB33 a",  # Some Workday instances use this class
+    ".job-card a",
+]
+
+
+def extract_workday_job_links(url, wait_seconds=15):
     """
     Extracts job listing links from a Workday careers page.
 
+    Uses a driver from the shared browser pool and waits once for any of
+    the known job link selectors instead of once per selector.
+
     Args:
         url (str): The Workday careers or job search URL
+        wait_seconds (int): Maximum time to wait for job links to render
 
     Returns:
         list: List of job posting URLs
     """
-    job_links = []
-
-    # Set up Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
+    # Selenium is only needed for Workday sites the CXS API cannot list
+    import driver_pool
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
 
-    driver = None
+    job_links = []
 
     try:
-        # Initialize the driver
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.get(url)
-
-        # Wait for job listings to load (common Workday selectors)
-        wait = WebDriverWait(driver, 15)
-
-        # Look for job cards/links using various common Workday selectors
-        selectors = [
-            "a[data-automation-id='jobTitle']",  # Most common
-            ".jobTitle a",
-            ".job-link",
-            "[data-automation-id='jobSearchResultsList'] a",
-            ".WB33 a",  # Some Workday instances use this class
-            ".job-card a",
-        ]
-
-        # Try each selector
-        for selector in selectors:
-            try:
-                # Wait for at least one element to be present
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-
-                # Get all matching elements
-                job_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-
-                if job_elements:
-                    # Extract links
-                    for element in job_elements:
-                        href = element.get_attribute("href")
-                        if (
-                            href and "job/" in href
-                        ):  # Most Workday job links contain "job/"
-                            job_links.append(href)
-
-                    # If we found links, no need to try other selectors
-                    if job_links:
-                        break
-            except:
-                # If this selector didn't work, try the next one
-                continue
+        with driver_pool.get_pool().checkout() as driver:
+            driver.get(url)
 
-        # If the above selectors didn't work, try a more generic approach
-        if not job_links:
-            # Look for any links that might be job postings
-            all_links = driver.find_elements(By.TAG_NAME, "a")
-            for link in all_links:
-                href = link.get_attribute("href")
-                # Filter for likely job posting links
-                if href and re.search(
-                    r"(job|requisition|position|career|opening|JobReq)",
-                    href,
-                    re.IGNORECASE,
-                ):
-                    job_links.append(href)
+            # Wait for job listings to load (common Workday selectors)
+            try:
+                WebDriverWait(driver, wait_seconds).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, ", ".join(workday_selectors))
+                    )
+                )
+            except TimeoutException:
+                print(f"No Workday job selector matched on {url}")
+
+            # Take links from the most specific selector that has any
+            for selector in workday_selectors:
+                for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                    href = element.get_attribute("href")
+                    if href and "job/" in href:  # Most Workday job links contain "job/"
+                        job_links.append(href)
+                if job_links:
+                    break
+
+            # If the above selectors didn't work, try a more generic approach
+            if not job_links:
+                # Look for any links that might be job postings
+                all_links = driver.find_elements(By.TAG_NAME, "a")
+                for link in all_links:
+                    href = link.get_attribute("href")
+                    # Filter for likely job posting links
+                    if href and re.search(
+                        r"(job|requisition|position|career|opening|JobReq)",
+                        href,
+                        re.IGNORECASE,
+                    ):
+                        job_links.append(href)
 
         # Remove duplicates while preserving order
         job_links = list(dict.fromkeys(job_links))
@@ -126,11 +113,6 @@ def extract_workday_job_links(url):
         print(f"Error extracting job links: {str(e)}")
         return []
 
-    finally:
-        # Always close the driver
-        if driver:
-            driver.quit()
-
     return job_links
 
 
@@ -146,10 +128,11 @@ def filter_subdomain_links(links_list, highest_link):
     """
     jobs_links = []
     # print(highest_link)
+    domain = extract_domain(highest_link)
 
     for i, link in enumerate(links_list):
         parsed_url = urlparse(link["url"])
-        if parsed_url.netloc == extract_domain(highest_link):
+        if parsed_url.netloc == domain:
             jobs_links.append(
                 {"index": i + 1, "url": link["url"], "text": link["text"]}
             )
@@ -179,48 +162,28 @@ def get_highest_scored_link(links_with_scores):
 
 
 def extract_links(url):
+    """
+    Fetch a page and extract its links.
+
+    Args:
+        url (str): The page to fetch
+
+    Returns:
+        list or None: Link dicts with "url" and "text" keys, or None if the
+                      page could not be fetched or parsed
+    """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
+        response = http_cache.fetch(url)
 
         if response.status_code == 200:
             print(f"Successfully accessed {url}")
             print(f"Status code: {response.status_code}")
 
-            # Parse the HTML content
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Extract and print the title
-            title = soup.title.string if soup.title else "No title found"
-            print(f"Page title: {title}")
-
-            # Extract all links
-            links = []
-            base_url = "{0.scheme}://{0.netloc}".format(urlparse(url))
-
-            for a_tag in soup.find_all("a", href=True):
-                href = a_tag["href"]
-
-                # Skip javascript and anchor links
-                if href.startswith("javascript:") or href.startswith("#"):
-                    continue
-
-                # Convert relative URLs to absolute URLs
-                if not href.startswith(("http://", "https://")):
-                    href = urljoin(base_url, href)
-
-                link_text = a_tag.text.strip()
-                if not link_text:
-                    link_text = "No text"
-
-                links.append(
-                    {
-                        "url": href,
-                        "text": link_text[:50] + ("..." if len(link_text) > 50 else ""),
-                    }
-                )
+            # Extract the title and all links
+            title, links = link_extract.extract_links_from_bytes(
+                response.content, url, response.encoding
+            )
+            print(f"Page title: {title or 'No title found'}")
 
             print(f"\nFound {len(links)} links on the page:\n")
             return links
@@ -228,62 +191,23 @@ def extract_links(url):
         else:
             print(f"Failed to access {url}")
             print(f"Status code: {response.status_code}")
-            return []
+            return None
 
     except Exception as e:
         print(f"An error occurred: {e}")
-        return []
-
+        return None
 
-def generate(prompt):
-    client = genai.Client(
-        api_key=os.environ.get("GEMINI_API_KEY"),
-    )
-
-    model = "gemini-2.0-flash"
-    contents = [
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(text=prompt),
-            ],
-        ),
-    ]
-    generate_content_config = types.GenerateContentConfig(
-        temperature=1,
-        top_p=0.95,
-        top_k=40,
-        max_output_tokens=8192,
-        response_mime_type="text/plain",
-    )
 
-    response = client.models.generate_content(
-        model="gemini-2.0-flash", contents=contents
-    )
-    return response.text
+def generate(prompt, schema=None):
+    # One shared client and event loop; concurrent callers' requests overlap
+    return llm.generate(prompt, schema)
 
 
 def setup_database():
     """
     Set up SQLite database with a table for job links
     """
-    conn = sqlite3.connect("job_links.db")
-    cursor = conn.cursor()
-
-    # Create table if it doesn't exist
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS job_links (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company TEXT NOT NULL,
-        link TEXT NOT NULL,
-        date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """
-    )
-
-    conn.commit()
-    conn.close()
+    storage.get_store()
     print("Database setup complete")
 
 
@@ -291,30 +215,7 @@ def create_next_links_table():
     """
     Create a comprehensive table to store and manage next page links for job listing pages
     """
-    conn = sqlite3.connect("job_links.db")
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS next_page_links (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company_name TEXT NOT NULL,
-        base_url TEXT NOT NULL,
-        next_page_url TEXT NOT NULL,
-        last_scraped_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-        domain TEXT NOT NULL,
-        extraction_method TEXT,
-        failed_attempts INTEGER DEFAULT 0,
-        
-        UNIQUE(company_name, base_url),
-        CHECK(failed_attempts >= 0),
-        CHECK(page_number > 0)
-    )
-    """
-    )
-
-    conn.commit()
-    conn.close()
+    storage.get_store()
 
 
 def insert_next_link(
@@ -328,62 +229,49 @@ def insert_next_link(
     """
     Insert or update a next page link for a specific company
     """
-    conn = sqlite3.connect("job_scraper.db")
-    cursor = conn.cursor()
-
+    store = storage.get_store()
     try:
-        cursor.execute(
-            """
-        INSERT OR REPLACE INTO next_page_links (
-            company_name, 
-            base_url, 
-            next_page_url, 
+        store.upsert_next_link(
+            company_name,
+            base_url,
+            next_page_url,
             domain,
             extraction_method,
-            last_scraped_timestamp
-        ) VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (
-                company_name,
-                base_url,
-                next_page_url,
-                domain,
-                extraction_method,
-                total_pages_found,
-                datetime.now(),
-            ),
+            total_pages_found,
         )
-        conn.commit()
+        store.flush()
     except sqlite3.Error as e:
         print(f"An error occurred: {e}")
-    finally:
-        conn.close()
 
 
-def save_job_links_to_db(job_links, company_name):
+def save_job_links_to_db(job_links, company_name, complete=False):
     """
     Save job links to SQLite database
 
+    Links are upserted on their canonical form, so saving the same
+    company again does not add duplicate rows. In incremental mode, after
+    a complete crawl, the company's stored links that are missing from
+    job_links are marked closed, all of them if job_links is empty.
+
     Args:
         job_links (list): List of job links
-        company_url (str): The company URL/domain
+        company_name (str): The company URL/domain
+        complete (bool): Whether job_links is every posting the company
+                         has, i.e. the crawl was not cut short
     """
+    store = storage.get_store()
+    if incremental.settings["enabled"] and complete:
+        closed = store.close_missing(company_name, job_links)
+        print(f"Marked {closed} vanished job links of {company_name} closed")
+
     if not job_links:
         print(f"No job links to save for {company_name}")
+        store.flush()
         return
 
-    conn = sqlite3.connect("job_links.db")
-    cursor = conn.cursor()
-
-    # Insert links
-    for link in job_links:
-        cursor.execute(
-            "INSERT INTO job_links (company, link) VALUES (?, ?)", (company_name, link)
-        )
-
-    conn.commit()
-    print(f"Saved {len(job_links)} job links for {company_name} to database")
-    conn.close()
+    count = store.save_job_links(company_name, job_links)
+    store.flush()
+    print(f"Saved {count} job links for {company_name} to database")
 
 
 def extract_link_from_result(text):
@@ -406,11 +294,124 @@ def extract_link_from_result(text):
     return None
 
 
-if __name__ == "__main__":
+def parse_job_position_links(response):
+    """
+    Parse the <job_position_links> block of an openPositions2 response.
+
+    Args:
+        response (str): The LLM output, optionally wrapped in ``` fences
+
+    Returns:
+        list: The lines inside the block
+
+    Raises:
+        ET.ParseError: If the response is not well-formed XML
+    """
+    filteredLines = [
+        line for line in response.split("\n") if not line.strip().startswith("```")
+    ]
+    cleanResponse = "\n".join(filteredLines)
+    root = ET.ElementTree(ET.fromstring(cleanResponse)).getroot()
+
+    # Extract job links (handling text within the root element)
+    return [line.strip() for line in (root.text or "").strip().split("\n")]
+
+
+def classify_job_links(links, page_url):
+    """
+    Ask the LLM which links of a careers page are job postings.
+
+    In incremental mode only the links that are new or changed since the
+    last crawl of the page are sent.
+
+    Args:
+        links (list): Link dicts from extract_links
+        page_url (str): The page the links came from
+
+    Returns:
+        list: Absolute job posting URLs
+
+    Raises:
+        ET.ParseError: If an openPositions2 response is not well-formed XML
+    """
+    filtered_links = filter_subdomain_links(links, page_url)
+    if incremental.settings["enabled"]:
+        return incremental.classify_changed(filtered_links, page_url, llm_classify)
+    return llm_classify(filtered_links, page_url)
+
+
+def llm_classify(filtered_links, page_url):
+    """
+    Classify links with openPositions2, in compact chunks.
+
+    Args:
+        filtered_links (list): Link dicts from filter_subdomain_links
+        page_url (str): The page the links came from
+
+    Returns:
+        list: Absolute job posting URLs
+    """
+    # pydantic is only imported when structured output is used
+    import structured
+
+    # Compact the links and split them so every prompt stays small
+    chunks = compaction.compact_prompt_inputs(
+        filtered_links, page_url, prompts.openPositions2
+    )
+    chunk_links = []
+    for chunk in chunks:
+        if structured.settings["enabled"]:
+            chunk_links.append(structured.job_links(generate, chunk))
+            continue
+        response = llm_cache.cached_generate(generate, prompts.openPositions2, chunk)
+        try:
+            chunk_links.append(parse_job_position_links(response))
+        except ET.ParseError:
+            print(f"Response: {response}")
+            raise
+    return compaction.merge_links(chunk_links, page_url)
+
+
+def find_next_link_llm(links, page_url):
+    """
+    Ask the LLM for the "Next" page link of a listing page.
+
+    Args:
+        links (list): Link dicts from extract_links
+        page_url (str): The page the links came from
+
+    Returns:
+        str or None: The absolute next page URL
+    """
+    import structured
+
+    filtered_links = filter_subdomain_links(links, page_url)
+    chunks = compaction.compact_prompt_inputs(
+        filtered_links, page_url, prompts.nextCheck
+    )
+    for chunk in chunks:
+        if structured.settings["enabled"]:
+            result = structured.next_link(generate, chunk)
+        else:
+            result = extract_link_from_result(
+                llm_cache.cached_generate(generate, prompts.nextCheck, chunk)
+            )
+        if result and result.startswith(("http://", "https://", "/")):
+            return urljoin(page_url, result)
+    return None
+
+
+def main(csv_path="job_links.csv"):
+    """
+    Extract, classify and store the job links of every company ranked by
+    scrpr.py.
+
+    Args:
+        csv_path (str): The job_links.csv written by scrpr.py
+    """
     # Set up the database first
     setup_database()
 
-    csv_path = "job_links.csv"
     companies = []
     with open(csv_path, "r", encoding="utf-8") as file:
         reader = csv.DictReader(file)
@@ -418,20 +419,48 @@ if __name__ == "__main__":
             converted_list = ast.literal_eval(row["Domain"])
             companies.append({"url": converted_list, "text": row["Links"]})
 
+    run_journal = journal.get_journal()
+    skipped = 0
     for company in companies:
+        company_key = company["url"][0]
+        # Skip companies whose job links were stored by an earlier run
+        if run_journal.is_done(company_key, "stored"):
+            skipped += 1
+            continue
+
         highest_link = ""
         print(f"Analyzing links for {company['url'][0]}...")
         # print(f"Links: {company['text']}")
         highest_link = get_highest_scored_link(company["text"])
 
         print(f"Highest scored link: {highest_link}")
-        if "workday" in highest_link:
+        if "workday" in highest_link or ats.detect(highest_link):
+            # Hosted job boards (Greenhouse, Lever, Ashby, SmartRecruiters,
+            # Workday) serve structured feeds, so there is nothing to scrape
+            # or classify. The browser is only a fallback for Workday URLs
+            # the API cannot resolve.
+            try:
+                job_info = ats.extract_ats_jobs(highest_link)
+                # The browser fallback only sees the first page of results
+                if job_info is None:
+                    job_links = extract_workday_job_links(highest_link)
+                else:
+                    job_links = [job["url"] for job in job_info]
+                print(f"\nExtracted {len(job_links)} job links from the ATS feed")
+                save_job_links_to_db(job_links, company_key, job_info is not None)
+            except Exception as e:
+                print(f"Error fetching ATS jobs: {e}")
+                run_journal.mark_failed(company_key, "extracted", e)
+                continue
+            run_journal.mark_done(company_key, "stored")
             continue
-            job_info = extract_workday_job_links(highest_link)
-            print("\nExtracted job information:")
-            pprint(job_info)
         elif highest_link:
             all_links = extract_links(highest_link)
+            if all_links is None:
+                error = LookupError(f"failed to access {highest_link}")
+                run_journal.mark_failed(company_key, "extracted", error)
+                continue
+            run_journal.mark_done(company_key, "extracted", str(len(all_links)))
         elif "example" in highest_link:
             continue
         else:
@@ -446,33 +475,56 @@ if __name__ == "__main__":
 
         # print(f"\nAll links have been saved to 'extracted_links.txt'")
 
-        # Filter the links
-        filtered_links = filter_subdomain_links(all_links, highest_link)
-
-        formatted_prompt = prompts.openPositions2.format(URL_TEXT_PAIRS=filtered_links)
-        response = generate(formatted_prompt)
-
-        filteredLines = [
-            line for line in response.split("\n") if not line.strip().startswith("```")
-        ]
-        cleanResponse = "\n".join(filteredLines)
+        stage = "classified"
+        # Unknown for links resumed from the journal, so nothing is closed
+        complete = False
         try:
-            root = ET.ElementTree(ET.fromstring(cleanResponse)).getroot()
-
-            # Extract job links (handling text within the root element)
-            job_links = [line.strip() for line in root.text.strip().split("\n")]
+            classified = run_journal.result(company_key, "classified")
+            if classified is None:
+                # Follow the listing's pagination, classifying every page
+                job_links, crawl = pagination.crawl_listing(
+                    highest_link,
+                    extract_links,
+                    classify_job_links,
+                    llm_next=find_next_link_llm,
+                    first_links=all_links,
+                )
+                print(f"Crawled {crawl['pages']} pages of {highest_link}")
+                complete = crawl["complete"]
+                print("next link result: ", crawl["last_next"])
+                if crawl["last_next"]:
+                    insert_next_link(
+                        company_key,
+                        highest_link,
+                        crawl["last_next"],
+                        extract_domain(highest_link),
+                        crawl["method"],
+                        crawl["pages"],
+                    )
+                run_journal.mark_done(company_key, "classified", "\n".join(job_links))
+            else:
+                job_links = classified.split("\n") if classified else []
 
             # Save job links to SQLite database instead of CSV
-            save_job_links_to_db(job_links, company["url"][0])
-
-            formatted_prompt = prompts.nextCheck.format(URL_TEXT_PAIRS=filtered_links)
-            nextLink = generate(formatted_prompt)
-            nextLink = extract_link_from_result(nextLink)
-            print("next link result: ", nextLink)
+            stage = "stored"
+            save_job_links_to_db(job_links, company["url"][0], complete)
+            run_journal.mark_done(company_key, "stored")
 
             print(f"\nFiltered links saved to database")
         except Exception as e:
             print(f"Error parsing response: {e}")
-            print(f"Response: {response}")
+            run_journal.mark_failed(company_key, stage, e)
             continue
         # break
+
+    print(f"Skipped {skipped} companies already stored per the run journal")
+    print(f"LLM cache: {llm_cache.get_cache().stats()}")
+    print(f"Run journal: {run_journal.summary()}")
+    metrics.dump()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    main()
@@ -0,0 +1,182 @@
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from compaction import canonicalize_url
+
+page_keys = {"page", "p", "pg", "pagenumber", "page_number", "pagenum", "pageno"}
+offset_keys = {"offset", "start", "from", "startrow", "first", "skip"}
+size_keys = {"limit", "size", "per_page", "perpage", "pagesize", "page_size", "rows"}
+
+path_page = re.compile(r"/page/(\d+)/?$")
+next_text = re.compile(r"^\s*(next( page)?|more jobs|load more|›|»|>|→)\s*$", re.I)
+
+
+def predict_next_pages(url, count, page_size=None):
+    """
+    Predict the URLs of the following pages from a paginated URL.
+
+    Args:
+        url (str): A listing page URL, e.g. with ?page=2 or offset=20
+        count (int): Number of following pages to predict
+        page_size (int): Jobs per page, used for offset parameters when
+                         the URL has no explicit limit
+
+    Returns:
+        list: The next `count` page URLs, or [] if the URL is not predictable
+    """
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+
+    def with_param(index, value):
+        updated = list(params)
+        updated[index] = (updated[index][0], str(value))
+        return urlunparse(parsed._replace(query=urlencode(updated)))
+
+    sizes = [int(v) for k, v in params if k.lower() in size_keys and v.isdigit()]
+    step = sizes[0] if sizes else page_size
+
+    for index, (key, value) in enumerate(params):
+        if not value.isdigit():
+            continue
+        if key.lower() in page_keys:
+            return [with_param(index, int(value) + n) for n in range(1, count + 1)]
+        if key.lower() in offset_keys and step:
+            return [
+                with_param(index, int(value) + n * step) for n in range(1, count + 1)
+            ]
+
+    match = path_page.search(parsed.path)
+    if match:
+        page = int(match.group(1))
+        return [
+            urlunparse(
+                parsed._replace(path=parsed.path[: match.start()] + f"/page/{page + n}")
+            )
+            for n in range(1, count + 1)
+        ]
+    return []
+
+
+def find_next_link(links, current_url):
+    """
+    Find the "Next" link of a listing page with local heuristics.
+
+    Args:
+        links (list): Dicts with "url" and "text" keys, from extract_links
+        current_url (str): The listing page the links came from
+
+    Returns:
+        str or None: The next page URL
+    """
+    expected = set(predict_next_pages(current_url, 1))
+    for link in links:
+        url = urljoin(current_url, link["url"])
+        if url == current_url:
+            continue
+        if next_text.match(link.get("text", "")) or url in expected:
+            return url
+    return None
+
+
+def crawl_listing(
+    start_url,
+    fetch_links,
+    classify,
+    llm_next=None,
+    max_pages=20,
+    parallel=4,
+    first_links=None,
+):
+    """
+    Harvest job links from every page of a paginated careers listing.
+
+    Each company gets its own frontier and visited set. When the next
+    URLs are predictable (?page=N, offset=, /page/N) up to `parallel`
+    pages are fetched at once. The next link is found with local
+    heuristics first and llm_next only when those fail. Pages that add
+    no new job links are not followed, and the crawl stops after a batch
+    in which no page added any.
+
+    Args:
+        start_url (str): The first listing page
+        fetch_links (callable): fetch_links(url) -> list of link dicts
+        classify (callable): classify(links, url) -> list of job URLs
+        llm_next (callable): llm_next(links, url) -> next URL or None
+        max_pages (int): Maximum number of pages fetched
+        parallel (int): Maximum number of pages fetched at once
+        first_links (list): Already extracted links of start_url
+
+    Returns:
+        tuple: (job links in discovery order, info dict with "pages",
+                "last_next", "method" and "complete", which is False when
+                max_pages cut the crawl short or a page failed to load)
+    """
+    job_links = {}
+    visited = set()
+    queued = {canonicalize_url(start_url)}
+    frontier = deque([start_url])
+    info = {"pages": 0, "last_next": None, "method": None, "complete": True}
+
+    def process(url):
+        if url == start_url and first_links is not None:
+            links = first_links
+        else:
+            links = fetch_links(url)
+        return url, links, (classify(links, url) if links else [])
+
+    def enqueue(urls):
+        for url in urls:
+            key = canonicalize_url(url)
+            if key not in queued:
+                queued.add(key)
+                frontier.append(url)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        while frontier and info["pages"] < max_pages:
+            batch = []
+            while frontier and len(batch) < min(parallel, max_pages - info["pages"]):
+                batch.append(frontier.popleft())
+            visited.update(batch)
+
+            # Merge the whole batch before deciding to stop, so pages fetched
+            # after a repeated one are not thrown away
+            progressed = False
+            for url, links, jobs in executor.map(process, batch):
+                info["pages"] += 1
+                if links is None:
+                    # fetch_links gives None for a page it could not load
+                    info["complete"] = False
+                    continue
+                new_jobs = [job for job in jobs if job not in job_links]
+                for job in new_jobs:
+                    job_links[job] = None
+                if not new_jobs:
+                    print(f"No new job links on {url}, not following it")
+                    continue
+                progressed = True
+
+                predicted = predict_next_pages(url, parallel, page_size=len(jobs))
+                if predicted:
+                    enqueue(predicted)
+                    info.update(last_next=predicted[0], method="pattern")
+                    continue
+
+                next_url = find_next_link(links, url)
+                method = "anchor"
+                if next_url is None and llm_next is not None:
+                    next_url = llm_next(links, url)
+                    method = "llm"
+                if next_url and next_url not in visited:
+                    # A next link often reveals the pattern for the pages after it
+                    enqueue([next_url] + predict_next_pages(next_url, parallel - 1))
+                    info.update(last_next=next_url, method=method)
+
+            if not progressed:
+                print(f"No new job links in the last {len(batch)} pages, stopping")
+                frontier.clear()
+
+    if frontier:
+        info["complete"] = False
+    return list(job_links), info
@@ -0,0 +1,306 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import ats
+import heuristic_rank
+import http_client
+import journal
+import llm_cache
+import metrics
+import openings
+import pagination
+import scrpr
+from discovery import find_careers_page_async
+
+# Shared settings for pipeline runs. Change them with configure().
+settings = {
+    "discover_workers": 32,  # aiohttp, cheap
+    "rank_workers": 8,  # homepage fetch + one linkRanker call
+    "extract_workers": 8,  # careers page fetch or ATS feed
+    "classify_workers": 4,  # openPositions2/nextCheck calls per listing page
+    "store_workers": 1,  # the job store is a single SQLite connection
+    "queue_size": 64,  # companies waiting between two stages
+}
+
+# Sentinel telling a stage worker that its upstream is finished
+_done = object()
+
+
+def configure(**options):
+    """
+    Update the pipeline settings used by the next run.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown pipeline settings: {sorted(unknown)}")
+    settings.update(options)
+
+
+class Company:
+    """
+    One company moving through the pipeline, with each stage's output.
+    """
+
+    def __init__(self, domain, careers_url=None):
+        self.domain = domain
+        self.careers_url = careers_url
+        self.ranking = None
+        self.target = None  # highest scored link of the ranking
+        self.links = None  # link dicts of the target page
+        self.job_links = None
+        # Whether job_links is every posting, so missing ones can be closed
+        self.complete = False
+        self.started = time.monotonic()
+
+
+def rank(company):
+    if company.ranking is None:
+        hrefs = scrpr.extract_hrefs(company.careers_url)
+        if hrefs is None:
+            raise LookupError(f"failed to access {company.careers_url}")
+        print(f"Found {len(hrefs)} links on {company.careers_url}")
+        # Obvious careers links are ranked locally; the LLM only sees the rest
+        company.ranking = heuristic_rank.confident_ranking(hrefs, company.careers_url)
+        if company.ranking is None:
+            company.ranking = scrpr.llm_rank(hrefs)
+    return "ranked", company.ranking
+
+
+def extract(company):
+    company.target = openings.get_highest_scored_link(company.ranking)
+    if not company.target or "example" in company.target:
+        raise LookupError("no valid careers link in ranking")
+
+    if "workday" in company.target or ats.detect(company.target):
+        # Hosted job boards need no classification, so the job links are
+        # known here and the classify stage passes them through
+        jobs = ats.extract_ats_jobs(company.target)
+        if jobs is None:
+            company.job_links = openings.extract_workday_job_links(company.target)
+        else:
+            company.job_links = [job["url"] for job in jobs]
+            company.complete = True
+        return "extracted", str(len(company.job_links))
+
+    # None means the fetch failed; the stage fails so a rerun retries it
+    company.links = openings.extract_links(company.target)
+    if company.links is None:
+        raise LookupError(f"failed to access {company.target}")
+    return "extracted", str(len(company.links))
+
+
+def classify(company):
+    if company.job_links is None:
+        company.job_links, crawl = pagination.crawl_listing(
+            company.target,
+            openings.extract_links,
+            openings.classify_job_links,
+            llm_next=openings.find_next_link_llm,
+            first_links=company.links,
+        )
+        company.complete = crawl["complete"]
+        if crawl["last_next"]:
+            openings.insert_next_link(
+                company.domain,
+                company.target,
+                crawl["last_next"],
+                openings.extract_domain(company.target),
+                crawl["method"],
+                crawl["pages"],
+            )
+    # The page links are not needed downstream
+    company.links = None
+    return "classified", "\n".join(company.job_links)
+
+
+def store(company):
+    openings.save_job_links_to_db(company.job_links, company.domain, company.complete)
+    return "stored", None
+
+
+def resume(domain, careers_url, run_journal):
+    """
+    Rebuild a company's state from the run journal.
+
+    Returns:
+        Company or None: None if the company was already stored
+    """
+    if run_journal.is_done(domain, "stored"):
+        return None
+    company = Company(domain, careers_url or run_journal.result(domain, "discovered"))
+    company.ranking = run_journal.result(domain, "ranked")
+    classified = run_journal.result(domain, "classified")
+    if classified is not None:
+        company.target = openings.get_highest_scored_link(company.ranking or "")
+        company.job_links = classified.split("\n") if classified else []
+    return company
+
+
+class Stats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latencies = []
+        self.failed = 0
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        done = len(latencies)
+        summary = {
+            "stored": done,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 1),
+            "companies_per_min": round(done / elapsed * 60, 2) if elapsed else 0.0,
+        }
+        if latencies:
+            summary["latency_p50_s"] = round(latencies[done // 2], 1)
+            summary["latency_max_s"] = round(latencies[-1], 1)
+        return summary
+
+
+async def run_pipeline(companies):
+    """
+    Run discovery, ranking, extraction, classification and storage as
+    concurrent stages connected by bounded queues.
+
+    Each stage has its own number of workers, so HTTP fetches, LLM calls
+    and database writes for different companies overlap. A full queue
+    blocks the stage before it, which keeps the number of companies in
+    flight, and so memory, bounded. Progress goes to the run journal
+    after every stage, so an interrupted run resumes where it stopped.
+
+    Args:
+        companies (iterable): (domain, careers_url) pairs; careers_url may
+                              be None or "" to discover it
+
+    Returns:
+        dict: Throughput and per-company latency summary
+    """
+    run_journal = journal.get_journal()
+    stats = Stats()
+    size = settings["queue_size"]
+    names = ["discover", "rank", "extract", "classify", "store"]
+    queues = {name: asyncio.Queue(maxsize=size) for name in names}
+    sync_workers = sum(settings[f"{name}_workers"] for name in names[1:])
+    executor = ThreadPoolExecutor(max_workers=sync_workers)
+    loop = asyncio.get_running_loop()
+
+    def stage_worker(name, work):
+        inbox = queues[name]
+        outbox = queues[names[names.index(name) + 1]] if name != "store" else None
+
+        async def worker():
+            while True:
+                company = await inbox.get()
+                if company is _done:
+                    return
+                try:
+                    with metrics.timer("stage_seconds", stage=name):
+                        if asyncio.iscoroutinefunction(work):
+                            stage, result = await work(company)
+                        else:
+                            stage, result = await loop.run_in_executor(
+                                executor, work, company
+                            )
+                    run_journal.mark_done(company.domain, stage, result)
+                    metrics.increment("stage_items_total", stage=name, status="done")
+                except Exception as e:
+                    metrics.increment("stage_items_total", stage=name, status="failed")
+                    print(f"[ERROR] {name} failed for {company.domain}: {e}")
+                    run_journal.mark_failed(
+                        company.domain, journal.stages[names.index(name)], e
+                    )
+                    stats.failed += 1
+                    continue
+
+                if name == "discover" and company.careers_url == "Not Found":
+                    continue
+                if outbox is not None:
+                    await outbox.put(company)
+                else:
+                    latency = time.monotonic() - company.started
+                    stats.latencies.append(latency)
+                    metrics.observe("company_seconds", latency)
+                    print(f"[DONE] {company.domain} in {latency:.1f}s")
+
+        return worker
+
+    async def run_stage(name, work):
+        workers = settings[f"{name}_workers"]
+        worker = stage_worker(name, work)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if name != "store":
+            following = names[names.index(name) + 1]
+            for _ in range(settings[f"{following}_workers"]):
+                await queues[following].put(_done)
+
+    async def feed():
+        skipped = 0
+        for domain, careers_url in companies:
+            company = resume(domain, careers_url, run_journal)
+            if company is None or company.careers_url == "Not Found":
+                skipped += 1
+                continue
+            # Skip the stages whose output the journal already has
+            if company.job_links is not None:
+                first = "store"
+            elif company.ranking is not None:
+                first = "extract"
+            elif company.careers_url:
+                first = "rank"
+            else:
+                first = "discover"
+            await queues[first].put(company)
+        print(f"Skipped {skipped} companies already finished per the run journal")
+        for _ in range(settings["discover_workers"]):
+            await queues["discover"].put(_done)
+
+    try:
+        async with http_client.async_session(limit_per_host=4) as session:
+
+            async def discover(company):
+                url = company.domain
+                if not urlparse(url).scheme:
+                    url = "https://" + url
+                company.careers_url = await find_careers_page_async(session, url)
+                return "discovered", company.careers_url
+
+            await asyncio.gather(
+                feed(),
+                run_stage("discover", discover),
+                run_stage("rank", rank),
+                run_stage("extract", extract),
+                run_stage("classify", classify),
+                run_stage("store", store),
+            )
+    finally:
+        executor.shutdown(wait=False)
+
+    summary = stats.summary()
+    print(f"Pipeline: {summary}")
+    print(f"LLM cache: {llm_cache.get_cache().stats()}")
+    print(f"Run journal: {run_journal.summary()}")
+    metrics.dump()
+    return summary
+
+
+def run(companies):
+    """
+    Synchronous entry point for run_pipeline.
+    """
+    return asyncio.run(run_pipeline(companies))
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "career_pages_ds.csv"
+    rows = scrpr.read_csv_to_list(csv_path)
+    run((row[0], row[1] if len(row) > 1 else None) for row in rows)
@@ -143,3 +143,22 @@ https://example.com/page/2
 </result>
 
 Begin your analysis now, followed by your final result."""
+
+
+linkRankerBatch = (
+    linkRanker
+    + """
+
+You will be given the URLs of SEVERAL companies at once. Each company's URLs are wrapped in <company id="N"> and </company> tags. Rank each company on its own, using only that company's URLs.
+
+For every company, output its ranked list between these exact delimiter lines, using the same id:
+=== COMPANY N ===
+1. [URL] - [Score]/100: [Brief explanation]
+...
+=== END N ===
+
+Output one block per company, in the order given, even if a company has no likely job URLs (leave its block empty in that case).
+
+Here are the companies:
+"""
+)
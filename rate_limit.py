@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Quotas for the rate limiters. Change them with configure().
+settings = {
+    "gemini_rpm": 15,  # requests per minute allowed by the API key
+    "gemini_tpm": 1_000_000,  # input tokens per minute allowed by the API key
+    "host_rate": 2.0,  # requests per second sent to a single target host
+    "host_burst": 10,  # requests a host may receive back to back
+    "min_rate_fraction": 0.05,  # adaptive backoff never drops below this share
+    "llm_retries": 3,  # attempts after a 429/5xx from the LLM API
+}
+
+_lock = threading.Lock()
+_gemini = None
+_hosts = {}
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value (str): Either a number of seconds or an HTTP date
+
+    Returns:
+        float or None: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with adaptive (AIMD) rate.
+
+    backoff() halves the refill rate and blocks the bucket for the
+    Retry-After period; every success() adds back 5% of the configured rate.
+    """
+
+    def __init__(self, rate, capacity):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, n=1):
+        """
+        Take n tokens, going into debt if needed.
+
+        Args:
+            n (float): Number of tokens to take
+
+        Returns:
+            float: Seconds the caller must wait before proceeding
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= n
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self, n=1):
+        wait = self.reserve(n)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, n=1):
+        wait = self.reserve(n)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def backoff(self, retry_after=None):
+        with self.lock:
+            floor = self.max_rate * settings["min_rate_fraction"]
+            self.rate = max(floor, self.rate / 2)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    def success(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class ApiLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for one API key.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm / 60, max(1, rpm / 60))
+        self.tokens = TokenBucket(tpm / 60, tpm)
+
+    def acquire(self, tokens):
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens):
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def backoff(self, retry_after=None):
+        self.requests.backoff(retry_after)
+
+    def success(self):
+        self.requests.success()
+
+
+def configure(**options):
+    """
+    Update the quotas. Limiters are rebuilt on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _gemini
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown rate_limit settings: {sorted(unknown)}")
+
+    with _lock:
+        settings.update(options)
+        _gemini = None
+        _hosts.clear()
+
+
+def gemini():
+    """
+    Returns:
+        ApiLimiter: The shared limiter for the Gemini API key
+    """
+    global _gemini
+    with _lock:
+        if _gemini is None:
+            _gemini = ApiLimiter(settings["gemini_rpm"], settings["gemini_tpm"])
+        return _gemini
+
+
+def for_host(host):
+    """
+    Args:
+        host (str): A target hostname
+
+    Returns:
+        TokenBucket: The politeness bucket for that host
+    """
+    with _lock:
+        bucket = _hosts.get(host)
+        if bucket is None:
+            bucket = TokenBucket(settings["host_rate"], settings["host_burst"])
+            _hosts[host] = bucket
+        return bucket
+
+
+def is_retryable(error):
+    """
+    Returns:
+        bool: Whether an LLM API error is a 429 or 5xx worth retrying
+    """
+    code = getattr(error, "code", None)
+    return code == 429 or (isinstance(code, int) and code >= 500)
+
+
+def retry_delay(error):
+    """
+    Returns:
+        float or None: The retry delay the server sent with an LLM API error
+    """
+    # google.genai errors carry the server's RetryInfo in their details
+    details = getattr(error, "details", None) or {}
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details", [])
+    for detail in details if isinstance(details, list) else []:
+        delay = isinstance(detail, dict) and detail.get("retryDelay")
+        if delay:
+            return parse_retry_after(str(delay).rstrip("s"))
+    return None
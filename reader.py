@@ -0,0 +1,531 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import metrics
+
+# Shared settings for the page reader. Change them with configure().
+settings = {
+    "budget": 20_000,  # characters of Markdown returned per page
+    "path": "reader_cache.db",
+    "ttl": 7 * 24 * 60 * 60,  # seconds a converted page stays cached
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Never content
+skip_tags = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "canvas",
+    "iframe",
+    "object",
+    "form",
+    "button",
+    "select",
+    "input",
+    "textarea",
+    "nav",
+    "footer",
+    "aside",
+}
+# Elements whose <header> belongs to them rather than to the page; job
+# boards put the posting's title in such headers
+sectioning_tags = {"article", "aside", "main", "nav", "section"}
+void_tags = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+block_tags = {
+    "address",
+    "article",
+    "blockquote",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "li",
+    "main",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "tr",
+    "ul",
+}
+# Tags that implicitly close an open <p> or <li> of the same kind
+implicit_close = {"p": {"p"}, "li": {"li"}, "tr": {"tr"}, "td": {"td", "th"}}
+implicit_close["th"] = implicit_close["td"]
+
+# class/id/role values of navigation, banners and other page chrome. Not
+# "header": Greenhouse keeps the job title and location in <div id="header">.
+boilerplate = re.compile(
+    r"(^|[\s_-])(nav|navbar|menu|footer|sidebar|breadcrumbs?|cookies?|"
+    r"consent|banner|modal|popup|newsletter|subscribe|social|share|related|"
+    r"promo|advert|ads?|skip|navigation|contentinfo|complementary)([\s_-]|$)",
+    re.IGNORECASE,
+)
+
+
+class Node:
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.parent = parent
+        self.children = []  # Nodes and text strings
+
+    def text(self):
+        return "".join(
+            child if isinstance(child, str) else child.text() for child in self.children
+        )
+
+    def iter(self):
+        yield self
+        for child in self.children:
+            if isinstance(child, Node):
+                yield from child.iter()
+
+
+class TreeBuilder(HTMLParser):
+    """
+    Lenient DOM builder on html.parser that leaves out skip_tags and
+    boilerplate elements while parsing.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("root")
+        self.current = self.root
+        self.title = ""
+        self.in_title = False
+        # (tag, nesting depth) of the element being dropped. Only that tag
+        # is counted, so unclosed <li> or <p> inside it cannot leak.
+        self.skipping = None
+
+    def ancestors(self):
+        node = self.current
+        while node is not self.root:
+            yield node.tag
+            node = node.parent
+
+    def handle_starttag(self, tag, attrs):
+        if self.skipping:
+            if tag == self.skipping[0]:
+                self.skipping = (tag, self.skipping[1] + 1)
+            return
+        attrs = dict(attrs)
+        if tag in void_tags:
+            if tag in ("br", "hr", "img"):
+                self.current.children.append(Node(tag, attrs, self.current))
+            return
+        marker = " ".join(
+            attrs.get(name) or "" for name in ("class", "id", "role", "aria-label")
+        )
+        if tag == "title":
+            # Only the document title; <svg><title> is skipped with the svg
+            self.in_title = "body" not in self.ancestors()
+        if (
+            tag in skip_tags
+            or (tag == "header" and not sectioning_tags & set(self.ancestors()))
+            or "hidden" in attrs
+            or attrs.get("aria-hidden") == "true"
+            or (tag not in ("body", "main", "article") and boilerplate.search(marker))
+        ):
+            self.skipping = (tag, 1)
+            return
+        closes = implicit_close.get(tag)
+        if closes and self.current.tag in closes:
+            self.current = self.current.parent
+        node = Node(tag, attrs, self.current)
+        self.current.children.append(node)
+        self.current = node
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.in_title = False
+        if self.skipping:
+            if tag == self.skipping[0]:
+                depth = self.skipping[1] - 1
+                self.skipping = (tag, depth) if depth else None
+            return
+        if tag in void_tags:
+            return
+        # Close up to the matching open element; stray end tags are ignored
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+        elif not self.skipping:
+            self.current.children.append(data)
+
+
+def squash(text):
+    return " ".join(text.split())
+
+
+def main_content(root):
+    """
+    Pick the element holding the page's main content.
+
+    <main>, <article> or role="main" win when they hold enough text.
+    Otherwise paragraphs are scored as readability does (length and
+    commas, discounted by the share of link text), each score is added
+    to the paragraph's parent and half of it to the grandparent, and the
+    best scoring element is returned. Its parent is returned instead
+    when siblings also carry content.
+
+    Returns:
+        Node: The content root
+    """
+    for node in root.iter():
+        if node.tag in ("main", "article") or node.attrs.get("role") == "main":
+            if len(squash(node.text())) > 200:
+                return node
+
+    scores = {}
+    for node in root.iter():
+        if node.tag not in ("p", "li", "pre", "td", "blockquote", "dd"):
+            continue
+        text = squash(node.text())
+        if len(text) < 25 or node.parent is None:
+            continue
+        links = sum(len(squash(a.text())) for a in node.iter() if a.tag == "a")
+        score = (1 + text.count(",") + min(len(text) / 100, 3)) * (
+            1 - links / len(text)
+        )
+        scores[node.parent] = scores.get(node.parent, 0) + score
+        if node.parent.parent is not None:
+            grandparent = node.parent.parent
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    if not scores:
+        return root
+
+    best = max(scores, key=scores.get)
+    parent = best.parent
+    if parent is not None and any(
+        scores.get(sibling, 0) >= scores[best] * 0.2
+        for sibling in parent.children
+        if isinstance(sibling, Node) and sibling is not best
+    ):
+        return parent
+    return best
+
+
+class MarkdownWriter:
+    """
+    Render a Node tree as compact Markdown.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.blocks = []
+
+    def inline(self, node):
+        parts = []
+        for child in node.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif child.tag == "br":
+                parts.append("\n")
+            elif child.tag == "img":
+                alt = squash(child.attrs.get("alt") or "")
+                if alt:
+                    parts.append(f" {alt} ")
+            elif child.tag == "a":
+                text = squash(self.inline(child))
+                href = child.attrs.get("href") or ""
+                if text and href and not href.startswith(("#", "javascript:")):
+                    parts.append(f"[{text}]({urljoin(self.base_url, href)})")
+                else:
+                    parts.append(text)
+            elif child.tag in ("strong", "b"):
+                text = squash(self.inline(child))
+                parts.append(f"**{text}**" if text else "")
+            elif child.tag in ("em", "i"):
+                text = squash(self.inline(child))
+                parts.append(f"*{text}*" if text else "")
+            elif child.tag == "code":
+                parts.append(f"`{squash(child.text())}`")
+            elif child.tag in block_tags or child.tag in ("td", "th"):
+                parts.append(" " + self.inline(child) + " ")
+            else:
+                parts.append(self.inline(child))
+        return "".join(parts)
+
+    def add(self, text):
+        text = "\n".join(squash(line) for line in text.split("\n")).strip()
+        if text:
+            self.blocks.append(text)
+
+    def block(self, node, depth=0):
+        """
+        Write node's children, turning block elements into Markdown blocks.
+        """
+        buffer = Node("span")
+        for child in node.children:
+            if isinstance(child, Node) and (
+                child.tag in block_tags or child.tag in ("tbody", "thead")
+            ):
+                self.add(self.inline(buffer))
+                buffer = Node("span")
+                self.element(child, depth)
+            else:
+                buffer.children.append(child)
+        self.add(self.inline(buffer))
+
+    def element(self, node, depth):
+        tag = node.tag
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = squash(self.inline(node))
+            if text:
+                self.blocks.append("#" * int(tag[1]) + " " + text)
+        elif tag in ("ul", "ol"):
+            items = [child for child in node.children if isinstance(child, Node)]
+            lines = []
+            for number, item in enumerate(items, 1):
+                text = squash(self.inline(item))
+                if text:
+                    bullet = f"{number}." if tag == "ol" else "-"
+                    lines.append("  " * depth + f"{bullet} {text}")
+            if lines:
+                self.blocks.append("\n".join(lines))
+        elif tag == "pre":
+            self.blocks.append("```\n" + node.text().strip("\n") + "\n```")
+        elif tag == "blockquote":
+            text = squash(self.inline(node))
+            if text:
+                self.blocks.append("> " + text)
+        elif tag == "hr":
+            self.blocks.append("---")
+        elif tag == "table":
+            self.table(node)
+        else:
+            self.block(node, depth)
+
+    def table(self, node):
+        rows = []
+        for row in node.iter():
+            if row.tag != "tr":
+                continue
+            cells = [
+                squash(self.inline(cell)).replace("|", "/")
+                for cell in row.children
+                if isinstance(cell, Node) and cell.tag in ("td", "th")
+            ]
+            if any(cells):
+                rows.append("| " + " | ".join(cells) + " |")
+                if len(rows) == 1:
+                    rows.append("|" + " --- |" * len(cells))
+        if rows:
+            self.blocks.append("\n".join(rows))
+
+
+def truncate(text, budget):
+    """
+    Cut Markdown to at most `budget` characters at a block boundary.
+    """
+    if len(text) <= budget:
+        return text
+    cut = text.rfind("\n\n", 0, budget)
+    if cut < budget // 2:
+        cut = text.rfind(" ", 0, budget)
+    return text[: cut if cut > 0 else budget].rstrip() + "\n\n[truncated]"
+
+
+def to_markdown(html, url="", budget=None):
+    """
+    Convert a page to LLM-friendly Markdown, without the page chrome.
+
+    Args:
+        html (str): The page HTML
+        url (str): The page URL, used to make links absolute
+        budget (int): Maximum characters, defaults to settings["budget"]
+
+    Returns:
+        str: Markdown with the title as a heading, then the main content
+    """
+    budget = budget or settings["budget"]
+    builder = TreeBuilder()
+    builder.feed(html)
+    builder.close()
+
+    writer = MarkdownWriter(url)
+    writer.element(main_content(builder.root), 0)
+    blocks = []
+    for block in writer.blocks:
+        # Repeated blocks are usually leftover chrome (e.g. "Apply now")
+        if block not in blocks[-3:]:
+            blocks.append(block)
+
+    title = squash(builder.title)
+    if title and (not blocks or squash(blocks[0].lstrip("#")) != title):
+        blocks.insert(0, f"# {title}")
+    return truncate("\n\n".join(blocks), budget)
+
+
+class ReaderCache:
+    """
+    SQLite cache of converted pages, keyed by URL, content hash and budget.
+    """
+
+    def __init__(self, path, ttl):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS reader_pages (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            markdown TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(url, html, budget):
+        digest = hashlib.sha256()
+        for part in (url, html, str(budget)):
+            digest.update(part.encode("utf-8", errors="replace"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT markdown, created_at FROM reader_pages WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return row[0]
+
+    def put(self, key, url, markdown):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reader_pages VALUES (?, ?, ?, ?)",
+                (key, url, markdown, time.time()),
+            )
+            self.conn.execute(
+                "DELETE FROM reader_pages WHERE created_at < ?",
+                (time.time() - self.ttl,),
+            )
+            self.conn.commit()
+
+
+def configure(**options):
+    """
+    Update the reader settings. The cache is reopened on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _cache
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown reader settings: {sorted(unknown)}")
+
+    with _cache_lock:
+        settings.update(options)
+        if _cache is not None:
+            _cache.conn.close()
+        _cache = None
+
+
+def get_cache():
+    """
+    Return the shared reader cache, opening it on first use.
+
+    Returns:
+        ReaderCache: The shared cache
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReaderCache(settings["path"], settings["ttl"])
+    return _cache
+
+
+def read_html(html, url="", budget=None):
+    """
+    to_markdown() with a cache keyed by URL and page content.
+
+    Args:
+        html (str): HTML already fetched, e.g. by the browser
+        url (str): The page URL
+        budget (int): Maximum characters, defaults to settings["budget"]
+
+    Returns:
+        str: The page as Markdown
+    """
+    budget = budget or settings["budget"]
+    cache = get_cache()
+    key = cache.key(url, html, budget)
+    markdown = cache.get(key)
+    if markdown is not None:
+        metrics.increment("cache_requests_total", cache="reader", result="hit")
+        return markdown
+    metrics.increment("cache_requests_total", cache="reader", result="miss")
+    with metrics.timer("reader_seconds"):
+        markdown = to_markdown(html, url, budget)
+    cache.put(key, url, markdown)
+    return markdown
+
+
+def read_url(url, budget=None):
+    """
+    Fetch a page through the HTTP cache and convert it to Markdown.
+
+    Args:
+        url (str): The page URL
+        budget (int): Maximum characters, defaults to settings["budget"]
+
+    Returns:
+        str: The page as Markdown
+
+    Raises:
+        requests.RequestException: If the page cannot be fetched
+    """
+    import http_cache
+
+    response = http_cache.fetch(url)
+    response.raise_for_status()
+    return read_html(response.text, url, budget)
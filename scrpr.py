@@ -1,19 +1,18 @@
 import requests
-from bs4 import BeautifulSoup
 import csv
-from time import sleep
-import requests
-from bs4 import BeautifulSoup
 import sys
 import base64
-import os
 import prompts
-from dotenv import load_dotenv
-from google.genai import types
-from google import genai
-
-
-load_dotenv()
+import http_client
+import http_cache
+import llm
+import llm_cache
+import batch_rank
+import heuristic_rank
+import journal
+import metrics
+import link_extract
+from discovery import career_paths, run_discovery
 
 linkRanker = prompts.linkRanker
 
@@ -26,30 +25,11 @@ def read_csv_to_list(file_path):
         return [row for row in reader]  # Assuming each row has one column
 
 
-# Read company domains from CSV file
-company_domains = read_csv_to_list("career_pages_ds.csv")
-# print(company_domains)
-# Common career page paths
-career_paths = [
-    "/careers",
-    "/careers/",
-    "/jobs",
-    "/jobs/",
-    "/about/careers",
-    "/company/careers",
-    "/en/careers",
-    "/employment",
-    "/work-with-us",
-]
-
-headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-
-
 def find_careers_page(domain):
     for path in career_paths:
         url = domain.rstrip("/") + path
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_client.get(url)
             if response.status_code == 200:
                 print(f"[FOUND] Careers page for {domain}: {url}")
                 return url
@@ -58,21 +38,12 @@ def find_careers_page(domain):
 
     # Fallback: Try to scrape the homepage for career-related links
     try:
-        response = requests.get(domain, headers=headers, timeout=10)
+        response = http_client.get(domain)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
-            for link in soup.find_all("a", href=True):
-                href = link["href"].lower()
-                if "career" in href or "job" in href or "work" in href:
-                    if href.startswith("http"):
-                        print(f"[SCRAPED] Possible careers page for {domain}: {href}")
-                        return href
-                    else:
-                        full_url = domain.rstrip("/") + "/" + href.lstrip("/")
-                        print(
-                            f"[SCRAPED] Possible careers page for {domain}: {full_url}"
-                        )
-                        return full_url
+            full_url = link_extract.find_career_link(response.text, domain)
+            if full_url:
+                print(f"[SCRAPED] Possible careers page for {domain}: {full_url}")
+                return full_url
     except requests.RequestException as e:
         print(f"[ERROR] Failed to scrape {domain}: {e}")
 
@@ -80,57 +51,71 @@ def find_careers_page(domain):
     return "Not Found"
 
 
-# Find career pages
-# career_pages = []
-# for domain in company_domains:
-#     careers_url = find_careers_page(domain)
-#     career_pages.append({"Company Domain": domain, "Careers Page URL": careers_url})
-#     sleep(2)
+def discover_careers_pages(domains, csv_filename="career_pages.csv", **kwargs):
+    """
+    Find careers pages for all domains concurrently and save them to CSV.
+
+    Domains already discovered by an earlier (possibly interrupted) run
+    are taken from the run journal instead of being probed again.
+
+    Args:
+        domains (list): Company domains, including scheme
+        csv_filename (str): Path of the CSV file to write
+        **kwargs: Concurrency options passed to discovery.run_discovery
+    """
+    run_journal = journal.get_journal()
+    found = {domain: run_journal.result(domain, "discovered") for domain in domains}
+
+    def record(page):
+        found[page["Company Domain"]] = page["Careers Page URL"]
+        run_journal.mark_done(
+            page["Company Domain"], "discovered", page["Careers Page URL"]
+        )
+
+    todo = [domain for domain, url in found.items() if url is None]
+    print(
+        f"Discovering {len(todo)} domains ({len(found) - len(todo)} already done"
+        " per the run journal, --fresh redoes them)"
+    )
+    run_discovery(todo, on_result=record, **kwargs)
 
-# # Save results to CSV
-# csv_filename = "career_pages.csv"
-# with open(csv_filename, mode="w", newline="", encoding="utf-8") as csvfile:
-#     fieldnames = ["Company Domain", "Careers Page URL"]
-#     writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    career_pages = [
+        {"Company Domain": domain, "Careers Page URL": found[domain]}
+        for domain in domains
+    ]
 
-#     writer.writeheader()
-#     writer.writerows(career_pages)
+    # Save results to CSV
+    with open(csv_filename, mode="w", newline="", encoding="utf-8") as csvfile:
+        fieldnames = ["Company Domain", "Careers Page URL"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
-# print(f"\n✅ Results saved to {csv_filename}")
+        writer.writeheader()
+        writer.writerows(career_pages)
 
+    print(f"\n✅ Results saved to {csv_filename}")
 
-def generate(prompt):
-    client = genai.Client(
-        api_key=os.environ.get("GEMINI_API_KEY"),
-    )
 
-    model = "gemini-2.0-flash"
-    contents = [
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(text=prompt),
-            ],
-        ),
-    ]
-    generate_content_config = types.GenerateContentConfig(
-        temperature=1,
-        top_p=0.95,
-        top_k=40,
-        max_output_tokens=8192,
-        response_mime_type="text/plain",
-    )
+def generate(prompt, schema=None):
+    # One shared client and event loop; concurrent callers' requests overlap
+    return llm.generate(prompt, schema)
 
-    # for chunk in client.models.generate_content_stream(
-    #     model=model,
-    #     contents=contents,
-    #     config=generate_content_config,
-    # ):
-    #     print(chunk.text, end="")
-    response = client.models.generate_content(
-        model="gemini-2.0-flash", contents=contents
-    )
-    return response.text
+
+def llm_rank(hrefs):
+    """
+    Rank hrefs with the linkRanker prompt.
+
+    Args:
+        hrefs (list): href values from a careers page
+
+    Returns:
+        str: Ranked list text in linkRanker format
+    """
+    # pydantic is only imported when structured output is used
+    import structured
+
+    if structured.settings["enabled"]:
+        return structured.rank_links(generate, hrefs)
+    return llm_cache.cached_generate(generate, linkRanker, "\n".join(hrefs))
 
 
 def extract_hrefs(url):
@@ -141,34 +126,25 @@ def extract_hrefs(url):
         url (str): The URL to fetch and parse
 
     Returns:
-        list: A list of all href values found in the page
+        list or None: A list of all href values found in the page, or None
+                      if the page could not be fetched or parsed
     """
     try:
-        # Send HTTP request to the URL
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        # Send HTTP request to the URL, revalidating any cached copy
+        response = http_cache.fetch(url)
 
         # Check if the request was successful
         response.raise_for_status()
 
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, "html.parser")
-
         # Find all elements with href attributes
-        links = []
-        for link in soup.find_all(href=True):
-            links.append(link["href"])
-
-        return links
+        return link_extract.extract_hrefs(response.text)
 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching URL: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"Error processing HTML: {e}")
-        return []
+        return None
 
 
 def append_to_csv(file_path, new_data):
@@ -184,27 +160,134 @@ def append_to_csv(file_path, new_data):
         writer.writerow(new_data)
 
 
-def main():
-    # Check if URL was provided as command line argument
+def main(csv_path="career_pages_ds.csv"):
+    company_domains = read_csv_to_list(csv_path)
+    run_journal = journal.get_journal()
+    skipped = 0
     for company_domain in company_domains:
+        # Skip companies whose ranking was written by an earlier run
+        if run_journal.is_done(company_domain[0], "ranked"):
+            skipped += 1
+            continue
         print(f"Processing {company_domain[0]}...")
-        if company_domain[1] != "Not Found":
-            hrefs = extract_hrefs(company_domain[1])
-            links = []
-            if hrefs:
-                print(f"Found {len(hrefs)} links on {company_domain}:")
-                for i, href in enumerate(hrefs, 1):
-                    links.append(href)
-                    # print(f"{i}. {href}")
+        try:
+            if company_domain[1] != "Not Found":
+                hrefs = extract_hrefs(company_domain[1])
+                if hrefs is None:
+                    raise LookupError(f"failed to access {company_domain[1]}")
+                links = []
+                if hrefs:
+                    print(f"Found {len(hrefs)} links on {company_domain}:")
+                    for i, href in enumerate(hrefs, 1):
+                        links.append(href)
+                        # print(f"{i}. {href}")
+                else:
+                    print(f"No links found on {company_domain}")
+                # Obvious careers links are ranked locally; the LLM only sees the rest
+                response = heuristic_rank.confident_ranking(links, company_domain[1])
+                if response is None:
+                    response = llm_rank(links)
+                print(response)
+                append_to_csv("job_links.csv", [company_domain, response])
+            else:
+                append_to_csv("job_links.csv", [company_domain[0], "Not Found"])
+        except Exception as e:
+            print(f"[ERROR] Ranking failed for {company_domain[0]}: {e}")
+            run_journal.mark_failed(company_domain[0], "ranked", e)
+            continue
+        run_journal.mark_done(company_domain[0], "ranked")
+
+    print(f"Skipped {skipped} companies already ranked per the run journal")
+    print(f"LLM cache: {llm_cache.get_cache().stats()}")
+    print(f"Run journal: {run_journal.summary()}")
+    metrics.dump()
+
+
+def main_batched(
+    csv_path="career_pages_ds.csv", window=100, token_budget=6000, max_companies=25
+):
+    """
+    Rank links for many companies per LLM call.
+
+    Companies with an obvious careers link are ranked locally, the rest
+    are batched. Companies are processed in windows so only `window` href
+    lists are held in memory at once. Rows are written in the same order and
+    format as main().
+
+    Args:
+        csv_path (str): CSV of (domain, careers page URL) rows
+        window (int): Number of companies fetched before ranking
+        token_budget (int): Maximum estimated input tokens per LLM call
+        max_companies (int): Maximum number of companies per LLM call
+    """
+    company_domains = read_csv_to_list(csv_path)
+    run_journal = journal.get_journal()
+    pending = [
+        row for row in company_domains if not run_journal.is_done(row[0], "ranked")
+    ]
+    print(
+        f"Skipped {len(company_domains) - len(pending)} companies already ranked"
+        " per the run journal"
+    )
+    for start in range(0, len(pending), window):
+        chunk = pending[start : start + window]
+        companies = []
+        rankings = {}
+        failed = set()
+        try:
+            for index, company_domain in enumerate(chunk):
+                print(f"Processing {company_domain[0]}...")
+                if company_domain[1] != "Not Found":
+                    hrefs = extract_hrefs(company_domain[1])
+                    if hrefs is None:
+                        error = LookupError(f"failed to access {company_domain[1]}")
+                        run_journal.mark_failed(company_domain[0], "ranked", error)
+                        failed.add(index)
+                        continue
+                    print(f"Found {len(hrefs)} links on {company_domain}")
+                    ranking = heuristic_rank.confident_ranking(hrefs, company_domain[1])
+                    if ranking is None:
+                        companies.append((index, hrefs))
+                    else:
+                        rankings[index] = ranking
+
+            rankings.update(
+                batch_rank.rank_companies(
+                    companies,
+                    generate,
+                    token_budget=token_budget,
+                    max_companies=max_companies,
+                )
+            )
+        except Exception as e:
+            print(f"[ERROR] Ranking failed for companies {start}-{start + window}: {e}")
+            for company_domain in chunk:
+                run_journal.mark_failed(company_domain[0], "ranked", e)
+            continue
+
+        for index, company_domain in enumerate(chunk):
+            if index in failed:
+                continue
+            if index in rankings:
+                append_to_csv("job_links.csv", [company_domain, rankings[index]])
             else:
-                print(f"No links found on {company_domain}")
-            response = generate(linkRanker + "\n".join(links))
-            print(response)
-            append_to_csv("job_links.csv", [company_domain, response])
-            sleep(10)
-        else:
-            append_to_csv("job_links.csv", [company_domain[0], "Not Found"])
+                append_to_csv("job_links.csv", [company_domain[0], "Not Found"])
+            run_journal.mark_done(company_domain[0], "ranked")
+
+    print(f"LLM cache: {llm_cache.get_cache().stats()}")
+    print(f"Run journal: {run_journal.summary()}")
+    metrics.dump()
 
 
 if __name__ == "__main__":
-    main()
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if len(sys.argv) > 1 and sys.argv[1] == "discover":
+        discover_careers_pages(
+            [row[0] for row in read_csv_to_list("career_pages_ds.csv")]
+        )
+    elif len(sys.argv) > 1 and sys.argv[1] == "batch":
+        main_batched()
+    else:
+        main()
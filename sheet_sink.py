@@ -0,0 +1,190 @@
+import json
+import sqlite3
+import threading
+import time
+
+import metrics
+
+# Shared settings for buffered sheet writes. Change them with configure().
+settings = {
+    "path": "sheet_buffer.db",  # rows wait here until the sheet has them
+    "batch_size": 50,  # rows that trigger a flush, and most rows per append_rows
+    "flush_interval": 5.0,  # seconds between flushes of a partial batch
+    "retries": 5,  # failed flushes in a row before close() gives up
+    "backoff": 1.0,  # seconds before the first retry, doubled after each failure
+    "max_backoff": 60.0,
+}
+
+
+class SheetSink:
+    """
+    Buffered, batched writer of rows to a worksheet.
+
+    append() stores the row in SQLite and returns at once; a daemon
+    thread sends the buffer with one append_rows call per batch, when
+    batch_size rows are waiting or every flush_interval seconds. A failed
+    flush is retried with exponential backoff and the rows stay on disk
+    meanwhile, so rows a crashed run left behind are sent by the next
+    one. Delivery is at least once: a crash between the write and the
+    buffer cleanup repeats a batch.
+
+    Args:
+        worksheet: Anything with gspread's append_rows(rows), e.g. a
+                   gspread.Worksheet or benchmarks.fixtures.FakeWorksheet
+        **options: Overrides of the module-level settings
+    """
+
+    def __init__(self, worksheet, **options):
+        unknown = set(options) - set(settings)
+        if unknown:
+            raise ValueError(f"Unknown sheet_sink settings: {sorted(unknown)}")
+        self.options = {**settings, **options}
+        self.worksheet = worksheet
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.options["path"], check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS sheet_rows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            row TEXT NOT NULL,
+            added_at REAL NOT NULL
+        )
+        """
+        )
+        self.conn.commit()
+        # In-memory copy of the buffer, oldest first: (id, row)
+        self.pending = [
+            (row_id, json.loads(row))
+            for row_id, row in self.conn.execute(
+                "SELECT id, row FROM sheet_rows ORDER BY id"
+            )
+        ]
+        self.failures = 0
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.idle = threading.Condition(self.lock)
+        self.thread = threading.Thread(target=self._run, name="sheet-sink", daemon=True)
+        self.thread.start()
+
+    def append(self, row):
+        """
+        Queue a row for the sheet. Only touches local disk, but waits for
+        the SQLite commit, so event loop code should call it through
+        asyncio.to_thread.
+
+        Args:
+            row (list): Cell values
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO sheet_rows (row, added_at) VALUES (?, ?)",
+                (json.dumps(row), time.time()),
+            )
+            self.conn.commit()
+            self.pending.append((cursor.lastrowid, row))
+            full = len(self.pending) >= self.options["batch_size"]
+        metrics.increment("sheet_rows_total", result="buffered")
+        # While the sheet is failing the buffer stays full; waking the
+        # writer on every row would cut its backoff short
+        if full and not self.failures:
+            self.wake.set()
+
+    def send_batch(self):
+        """
+        Send the oldest batch of buffered rows.
+
+        Returns:
+            bool: Whether rows are still waiting
+
+        Raises:
+            Exception: Whatever append_rows raised; the rows stay buffered
+        """
+        with self.lock:
+            batch = self.pending[: self.options["batch_size"]]
+        if not batch:
+            return False
+        with metrics.timer("sheet_append_seconds"):
+            self.worksheet.append_rows([row for _, row in batch])
+        metrics.increment("sheet_rows_total", len(batch), result="written")
+        with self.lock:
+            del self.pending[: len(batch)]
+            self.conn.executemany(
+                "DELETE FROM sheet_rows WHERE id = ?",
+                [(row_id,) for row_id, _ in batch],
+            )
+            self.conn.commit()
+            if not self.pending:
+                self.idle.notify_all()
+            return bool(self.pending)
+
+    def _run(self):
+        while True:
+            if self.failures:
+                delay = min(
+                    self.options["backoff"] * 2 ** (self.failures - 1),
+                    self.options["max_backoff"],
+                )
+            else:
+                delay = self.options["flush_interval"]
+            self.wake.wait(delay)
+            self.wake.clear()
+            stopping = self.stopping.is_set()
+            try:
+                while self.send_batch():
+                    pass
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                metrics.increment("sheet_retries_total", error=type(e).__name__)
+                print(f"Sheet write failed ({e}), retry {self.failures}")
+                if stopping and self.failures > self.options["retries"]:
+                    print(f"Giving up, {len(self.pending)} rows kept in the buffer")
+                    break
+                continue
+            if stopping:
+                break
+        with self.lock:
+            self.idle.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Send everything buffered now and wait for it.
+
+        Args:
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            bool: Whether the buffer is empty
+        """
+        self.wake.set()
+        with self.lock:
+            self.idle.wait_for(
+                lambda: not self.pending or not self.thread.is_alive(), timeout
+            )
+            return not self.pending
+
+    def close(self, timeout=None):
+        """
+        Flush the buffer and stop the writer thread. Rows that could not
+        be sent stay on disk for the next run.
+        """
+        self.stopping.set()
+        self.wake.set()
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            with self.lock:
+                self.conn.close()
+
+
+def configure(**options):
+    """
+    Update the defaults of sinks created afterwards.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown sheet_sink settings: {sorted(unknown)}")
+    settings.update(options)
@@ -0,0 +1,364 @@
+import sqlite3
+import threading
+
+import metrics
+from compaction import canonicalize_url
+
+# Shared settings for the job link store. Change them with configure().
+settings = {
+    "path": "job_links.db",
+    "commit_every": 500,  # rows written before an automatic commit
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class JobStore:
+    """
+    Long-lived SQLite connection for job links and next page links.
+
+    Job links are bulk upserted with executemany on a unique canonical
+    link, so re-running a company refreshes last_seen instead of adding
+    duplicate rows. Writes are committed every `commit_every` rows or on
+    flush().
+
+    For incremental recrawls (incremental.py) it also keeps a fingerprint
+    of every crawled page and the classification of each of its links.
+    """
+
+    def __init__(self, path, commit_every=500):
+        self.commit_every = commit_every
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.setup()
+
+    def setup(self):
+        """
+        Create the tables and indexes, migrating older job_links tables.
+        """
+        with self.lock:
+            self.conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS job_links (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                company TEXT NOT NULL,
+                link TEXT NOT NULL,
+                date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            columns = {
+                row[1] for row in self.conn.execute("PRAGMA table_info(job_links)")
+            }
+            if "canonical_link" not in columns:
+                self.conn.execute(
+                    "ALTER TABLE job_links ADD COLUMN canonical_link TEXT"
+                )
+                rows = self.conn.execute("SELECT id, link FROM job_links").fetchall()
+                self.conn.executemany(
+                    "UPDATE job_links SET canonical_link = ? WHERE id = ?",
+                    [(canonicalize_url(link), row_id) for row_id, link in rows],
+                )
+                # Drop duplicates left by earlier runs before adding the unique index
+                self.conn.execute(
+                    """
+                DELETE FROM job_links WHERE id NOT IN (
+                    SELECT MIN(id) FROM job_links GROUP BY canonical_link
+                )
+                """
+                )
+            if "last_seen" not in columns:
+                self.conn.execute(
+                    "ALTER TABLE job_links ADD COLUMN last_seen TIMESTAMP"
+                )
+                self.conn.execute("UPDATE job_links SET last_seen = date_added")
+            if "status" not in columns:
+                # "closed" once a recrawl no longer finds the link
+                self.conn.execute(
+                    "ALTER TABLE job_links ADD COLUMN status TEXT NOT NULL DEFAULT 'open'"
+                )
+                self.conn.execute(
+                    "ALTER TABLE job_links ADD COLUMN closed_at TIMESTAMP"
+                )
+
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_job_links_canonical ON job_links (canonical_link)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_links_company ON job_links (company)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_links_date_added ON job_links (date_added)"
+            )
+
+            self.conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS page_crawls (
+                page_url TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                crawled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            self.conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS link_classifications (
+                page_url TEXT NOT NULL,
+                canonical_link TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                is_job INTEGER NOT NULL,
+                classified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (page_url, canonical_link)
+            )
+            """
+            )
+
+            self.conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS next_page_links (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                company_name TEXT NOT NULL,
+                base_url TEXT NOT NULL,
+                next_page_url TEXT NOT NULL,
+                last_scraped_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                domain TEXT NOT NULL,
+                extraction_method TEXT,
+                failed_attempts INTEGER DEFAULT 0,
+                total_pages_found INTEGER,
+
+                UNIQUE(company_name, base_url),
+                CHECK(failed_attempts >= 0),
+                CHECK(total_pages_found IS NULL OR total_pages_found > 0)
+            )
+            """
+            )
+            self.conn.commit()
+
+    def _wrote(self, count):
+        self.pending += count
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+
+    def save_job_links(self, company, job_links):
+        """
+        Bulk upsert job links for a company.
+
+        Args:
+            company (str): The company name/domain
+            job_links (list): Job posting URLs
+
+        Returns:
+            int: Number of links written
+        """
+        rows = {}
+        for link in job_links:
+            link = link.strip()
+            if link:
+                rows.setdefault(canonicalize_url(link), link)
+
+        with self.lock, metrics.timer("db_write_seconds", op="save_job_links"):
+            self.conn.executemany(
+                """
+            INSERT INTO job_links (company, link, canonical_link, last_seen)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (canonical_link) DO UPDATE SET
+                last_seen = CURRENT_TIMESTAMP,
+                status = 'open',
+                closed_at = NULL
+            """,
+                [(company, link, canonical) for canonical, link in rows.items()],
+            )
+            self._wrote(len(rows))
+        return len(rows)
+
+    def close_missing(self, company, job_links):
+        """
+        Mark a company's open job links that are not in job_links as closed.
+
+        Args:
+            company (str): The company name/domain
+            job_links (list): Every job posting URL the company has now
+
+        Returns:
+            int: Number of links closed
+        """
+        current = {canonicalize_url(link) for link in job_links if link.strip()}
+        with self.lock, metrics.timer("db_write_seconds", op="close_missing"):
+            rows = self.conn.execute(
+                "SELECT canonical_link FROM job_links WHERE company = ? AND status = 'open'",
+                (company,),
+            ).fetchall()
+            vanished = [(link,) for (link,) in rows if link not in current]
+            self.conn.executemany(
+                """
+            UPDATE job_links SET status = 'closed', closed_at = CURRENT_TIMESTAMP
+            WHERE canonical_link = ?
+            """,
+                vanished,
+            )
+            self._wrote(len(vanished))
+        return len(vanished)
+
+    def page_fingerprint(self, page_url):
+        """
+        Returns:
+            str or None: The link set fingerprint of the last crawl of a page
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fingerprint FROM page_crawls WHERE page_url = ?", (page_url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def link_classifications(self, page_url):
+        """
+        Returns:
+            dict: Canonical link -> (fingerprint, is_job) for a crawled page
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                """
+            SELECT canonical_link, fingerprint, is_job FROM link_classifications
+            WHERE page_url = ?
+            """,
+                (page_url,),
+            ).fetchall()
+        return {link: (fingerprint, bool(is_job)) for link, fingerprint, is_job in rows}
+
+    def save_page_crawl(self, page_url, fingerprint, classified, links):
+        """
+        Record a crawl of a page.
+
+        Args:
+            page_url (str): The canonical page URL
+            fingerprint (str): Fingerprint of the page's link set
+            classified (list): (canonical link, link fingerprint, is_job)
+                               tuples for the links classified this time
+            links (list): Every canonical link now on the page; the
+                          classifications of the others are dropped
+        """
+        with self.lock, metrics.timer("db_write_seconds", op="save_page_crawl"):
+            self.conn.executemany(
+                """
+            INSERT INTO link_classifications (page_url, canonical_link, fingerprint, is_job)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (page_url, canonical_link) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                is_job = excluded.is_job,
+                classified_at = CURRENT_TIMESTAMP
+            """,
+                [
+                    (page_url, link, link_print, int(is_job))
+                    for link, link_print, is_job in classified
+                ],
+            )
+            current = set(links)
+            stored = self.conn.execute(
+                "SELECT canonical_link FROM link_classifications WHERE page_url = ?",
+                (page_url,),
+            ).fetchall()
+            self.conn.executemany(
+                "DELETE FROM link_classifications WHERE page_url = ? AND canonical_link = ?",
+                [(page_url, link) for (link,) in stored if link not in current],
+            )
+            self.conn.execute(
+                """
+            INSERT INTO page_crawls (page_url, fingerprint, crawled_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (page_url) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                crawled_at = excluded.crawled_at
+            """,
+                (page_url, fingerprint),
+            )
+            self._wrote(len(classified) + 1)
+
+    def upsert_next_link(
+        self,
+        company_name,
+        base_url,
+        next_page_url,
+        domain,
+        extraction_method="default",
+        total_pages_found=None,
+    ):
+        """
+        Insert or update the next page link for a company's listing page.
+        """
+        with self.lock, metrics.timer("db_write_seconds", op="upsert_next_link"):
+            self.conn.execute(
+                """
+            INSERT INTO next_page_links (
+                company_name,
+                base_url,
+                next_page_url,
+                domain,
+                extraction_method,
+                total_pages_found,
+                last_scraped_timestamp
+            ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (company_name, base_url) DO UPDATE SET
+                next_page_url = excluded.next_page_url,
+                domain = excluded.domain,
+                extraction_method = excluded.extraction_method,
+                total_pages_found = excluded.total_pages_found,
+                last_scraped_timestamp = excluded.last_scraped_timestamp
+            """,
+                (
+                    company_name,
+                    base_url,
+                    next_page_url,
+                    domain,
+                    extraction_method,
+                    total_pages_found,
+                ),
+            )
+            self._wrote(1)
+
+    def flush(self):
+        with self.lock, metrics.timer("db_write_seconds", op="commit"):
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def configure(**options):
+    """
+    Update the store settings. The store is reopened on next use.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    global _store
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown storage settings: {sorted(unknown)}")
+
+    with _store_lock:
+        settings.update(options)
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+def get_store():
+    """
+    Return the shared job store, opening it on first use.
+
+    Returns:
+        JobStore: The shared store
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobStore(settings["path"], settings["commit_every"])
+    return _store
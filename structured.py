@@ -0,0 +1,324 @@
+import json
+import re
+from functools import partial
+from typing import List, Optional
+from urllib.parse import urljoin
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+import llm_cache
+import prompts
+from compaction import canonicalize_url
+from heuristic_rank import format_ranking
+
+# Shared settings for structured output. Change them with configure().
+settings = {
+    "enabled": False,  # ask for JSON instead of the prompts' text formats
+    "retries": 1,  # re-asks for a response that is not valid JSON
+}
+
+# Appended to the prompt templates, whose own instructions ask for text
+json_instructions = """
+
+Ignore the output format described above. Respond only with JSON matching the response schema.
+
+"""
+
+fence = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+url_like = re.compile(r"^(https?://|/)\S+$")
+
+
+class RankedLink(BaseModel):
+    url: str = Field(description="One of the given URLs, unchanged")
+    score: int = Field(ge=0, le=100, description="Likelihood of job listings, 0-100")
+    reason: str = Field(default="", description="Brief explanation")
+
+    @field_validator("url")
+    @classmethod
+    def check_url(cls, url):
+        url = url.strip()
+        if not url_like.match(url):
+            raise ValueError("not an absolute URL or path")
+        return url
+
+    @field_validator("reason")
+    @classmethod
+    def one_line(cls, reason):
+        return " ".join(reason.split())
+
+
+class LinkRanking(BaseModel):
+    links: List[RankedLink] = Field(description="Top 5 URLs, best first")
+
+
+class CompanyRanking(BaseModel):
+    company: int = Field(description="The id of the <company> block")
+    links: List[RankedLink] = Field(description="Top 5 URLs, best first")
+
+
+class BatchRanking(BaseModel):
+    companies: List[CompanyRanking]
+
+
+class JobLinks(BaseModel):
+    job_links: List[str] = Field(description="Paths or URLs of job postings")
+
+
+class NextPage(BaseModel):
+    next_url: Optional[str] = Field(
+        default=None, description="Path or URL of the next page, null if none"
+    )
+
+
+def configure(**options):
+    """
+    Update the structured output settings.
+
+    Args:
+        **options: Any key of the module-level settings dict
+    """
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown structured settings: {sorted(unknown)}")
+    settings.update(options)
+
+
+def load_json(text):
+    """
+    Parse a JSON object from an LLM response, tolerating code fences and
+    text around the object.
+
+    Returns:
+        dict or None: The object, or None if there is none to repair
+    """
+    text = fence.sub("", (text or "").strip())
+    candidates = [text]
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        candidates.append(text[start : end + 1])
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def valid_items(items, model, accept=None):
+    """
+    Validate list items one at a time, keeping only those that pass.
+
+    Args:
+        items: The list from the response
+        model: pydantic model for one item, or a type like str
+        accept (callable): Further check on each validated item
+
+    Returns:
+        list: Validated items
+    """
+    valid = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            if isinstance(model, type) and issubclass(model, BaseModel):
+                item = model.model_validate(item)
+            elif not isinstance(item, model):
+                continue
+        except ValidationError:
+            continue
+        if accept is None or accept(item):
+            valid.append(item)
+    return valid
+
+
+def request(generate, template, payload, schema, parse):
+    """
+    Make a cached structured call and parse it.
+
+    A response that is not JSON, or whose items all fail validation, is
+    not cached and is asked for again up to settings["retries"] times.
+
+    Args:
+        generate (callable): generate(prompt, schema=None)
+        template (str): A prompt from prompts.py
+        payload: The prompt input
+        schema: The pydantic model of the response
+        parse (callable): parse(dict) -> result, or None if unusable
+
+    Returns:
+        The parsed result, or None if every attempt failed
+    """
+
+    def usable(response):
+        data = load_json(response)
+        return data is not None and parse(data) is not None
+
+    for attempt in range(settings["retries"] + 1):
+        response = llm_cache.cached_generate(
+            partial(generate, schema=schema),
+            template + json_instructions,
+            payload,
+            validate=usable,
+        )
+        data = load_json(response)
+        result = parse(data) if data is not None else None
+        if result is not None:
+            return result
+        print(f"Unusable structured response (attempt {attempt + 1})")
+    return None
+
+
+def ranked_items(items):
+    ranked = sorted(valid_items(items, RankedLink), key=lambda link: -link.score)
+    if items and not ranked:
+        return None
+    return format_ranking([(link.url, link.score, link.reason) for link in ranked[:5]])
+
+
+def rank_links(generate, hrefs):
+    """
+    linkRanker with a JSON response.
+
+    Args:
+        generate (callable): generate(prompt, schema=None)
+        hrefs (list): href values from the careers page
+
+    Returns:
+        str: The ranking in linkRanker's "N. URL - score/100: reason"
+             format, empty if the model gave none
+    """
+    ranking = request(
+        generate,
+        prompts.linkRanker,
+        "\n".join(hrefs),
+        LinkRanking,
+        lambda data: ranked_items(data.get("links")),
+    )
+    return ranking or ""
+
+
+def rank_batch(generate, payload, count):
+    """
+    linkRankerBatch with a JSON response.
+
+    Args:
+        generate (callable): generate(prompt, schema=None)
+        payload (str): The <company id="N"> blocks
+        count (int): Number of companies in the payload
+
+    Returns:
+        dict: Batch-local company id -> ranking text, empty for a company
+              given no links. Companies that are missing or whose links
+              all fail validation are left out so the caller retries only
+              those.
+    """
+
+    def parse(data):
+        sections = {}
+        for company in valid_items(data.get("companies"), CompanyRanking):
+            if 1 <= company.company <= count:
+                ranking = ranked_items([link.model_dump() for link in company.links])
+                if ranking is not None:
+                    sections[company.company] = ranking
+        return sections or None
+
+    return (
+        request(generate, prompts.linkRankerBatch, payload, BatchRanking, parse) or {}
+    )
+
+
+def table_urls(table):
+    """
+    The links of a compaction.encode_table chunk.
+
+    Returns:
+        dict: Canonical absolute URL -> the path or URL as in the table
+    """
+    lines = table.split("\n")
+    base = lines[0].partition("base: ")[2]
+    paths = [line.split(" | ", 1)[0] for line in lines[2:]]
+    return {canonicalize_url(urljoin(base, path)): path for path in paths}
+
+
+def table_link(urls, table, link):
+    """
+    Match a link from a response to a row of the table, tolerating an
+    absolute URL for a relative row and vice versa.
+
+    Returns:
+        str or None: The path or URL as in the table, None if made up
+    """
+    link = link.strip()
+    if not url_like.match(link):
+        return None
+    base = table.split("\n", 1)[0].partition("base: ")[2]
+    return urls.get(canonicalize_url(urljoin(base, link)))
+
+
+def split_table(table):
+    header, rows = table.split("\n")[:2], table.split("\n")[2:]
+    half = len(rows) // 2
+    return ["\n".join(header + part) for part in (rows[:half], rows[half:]) if part]
+
+
+def job_links(generate, chunk, split=True):
+    """
+    openPositions2 with a JSON response for one compact link table.
+
+    Links are matched to the table rows whether the model answers with
+    the path or the absolute URL; links it made up are dropped, and an
+    answer with nothing but made-up links counts as unusable. If no
+    usable answer comes back for the chunk, its two halves are asked for
+    separately.
+
+    Args:
+        generate (callable): generate(prompt, schema=None)
+        chunk (str): A table from compaction.compact_prompt_inputs
+        split (bool): Whether a failed chunk may be split
+
+    Returns:
+        list: Paths or URLs of job postings, as in the table
+    """
+    urls = table_urls(chunk)
+
+    def parse(data):
+        items = data.get("job_links")
+        links = [table_link(urls, chunk, link) for link in valid_items(items, str)]
+        links = [link for link in links if link is not None]
+        # Every link made up is as unusable as no JSON at all
+        if items and not links:
+            return None
+        return links
+
+    links = request(generate, prompts.openPositions2, chunk, JobLinks, parse)
+    if links is not None:
+        return links
+    if split and len(urls) > 1:
+        return [
+            link
+            for half in split_table(chunk)
+            for link in job_links(generate, half, False)
+        ]
+    return []
+
+
+def next_link(generate, chunk):
+    """
+    nextCheck with a JSON response for one compact link table.
+
+    Returns:
+        str or None: The next page path or URL from the table
+    """
+    urls = table_urls(chunk)
+
+    def parse(data):
+        try:
+            url = NextPage.model_validate(data).next_url
+        except ValidationError:
+            return None
+        url = (url or "").strip()
+        # "" means no next page; an invented URL is unusable
+        return url and table_link(urls, chunk, url)
+
+    return request(generate, prompts.nextCheck, chunk, NextPage, parse) or None
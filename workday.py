@@ -0,0 +1,151 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import http_client
+
+# https://{tenant}.wd{N}.myworkdayjobs.com[/{locale}]/{site}[/...]
+workday_host = re.compile(r"^(?P<tenant>[\w-]+)\.wd\d+\.myworkdayjobs\.com$", re.I)
+locale_segment = re.compile(r"^[a-z]{2}-[A-Z]{2}$")
+
+# The CXS endpoint refuses pages larger than this
+max_page_size = 20
+
+
+class WorkdaySite:
+    """
+    A Workday tenant's job site and its CXS JSON listing endpoint.
+
+    Args:
+        host (str): e.g. "acme.wd5.myworkdayjobs.com"
+        tenant (str): e.g. "acme"
+        site (str): e.g. "External"
+        locale (str): Locale path segment of the careers URL, if any
+        api_base (str): Override for "https://{host}", e.g. a local mock server
+    """
+
+    def __init__(self, host, tenant, site, locale=None, api_base=None):
+        self.host = host
+        self.tenant = tenant
+        self.site = site
+        self.locale = locale
+        self.api_base = (api_base or f"https://{host}").rstrip("/")
+
+    @property
+    def jobs_endpoint(self):
+        return f"{self.api_base}/wday/cxs/{self.tenant}/{self.site}/jobs"
+
+    def job_url(self, external_path):
+        prefix = f"/{self.locale}" if self.locale else ""
+        return f"https://{self.host}{prefix}/{self.site}{external_path}"
+
+
+def parse_workday_url(url, api_base=None):
+    """
+    Derive the tenant and site from a Workday careers URL.
+
+    Args:
+        url (str): A careers, job search or job posting URL on myworkdayjobs.com
+        api_base (str): Override for the API origin, e.g. a local mock server
+
+    Returns:
+        WorkdaySite or None: None if the URL is not a recognizable Workday site
+    """
+    parsed = urlparse(url)
+    match = workday_host.match(parsed.netloc)
+    if not match:
+        return None
+
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    if segments[:2] == ["wday", "cxs"] and len(segments) >= 4:
+        return WorkdaySite(parsed.netloc, segments[2], segments[3], api_base=api_base)
+
+    locale = None
+    if segments and locale_segment.match(segments[0]):
+        locale = segments.pop(0)
+    if not segments:
+        return None
+    return WorkdaySite(
+        parsed.netloc, match.group("tenant"), segments[0], locale, api_base
+    )
+
+
+def fetch_page(site, offset, limit=max_page_size, search_text=""):
+    """
+    Fetch one page of the CXS job listing.
+
+    Returns:
+        dict: The decoded JSON body ("total", "jobPostings", ...)
+    """
+    response = http_client.post(
+        site.jobs_endpoint,
+        json={
+            "appliedFacets": {},
+            "limit": limit,
+            "offset": offset,
+            "searchText": search_text,
+        },
+        headers={"Accept": "application/json"},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_jobs(site, parallel=4, max_jobs=2000):
+    """
+    Page through a Workday site's job listing without a browser.
+
+    The first page gives the total; the remaining pages are fetched
+    concurrently.
+
+    Args:
+        site (WorkdaySite): The site to list
+        parallel (int): Number of pages fetched at once
+        max_jobs (int): Upper bound on postings fetched
+
+    Returns:
+        list: {"title", "url", "location"} dicts in listing order
+    """
+    first = fetch_page(site, 0)
+    # Only the first page reliably carries the total
+    total = min(first.get("total") or 0, max_jobs)
+    offsets = range(max_page_size, total, max_page_size)
+
+    pages = [first]
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        pages.extend(executor.map(lambda offset: fetch_page(site, offset), offsets))
+
+    jobs = {}
+    for page in pages:
+        for posting in page.get("jobPostings") or []:
+            path = posting.get("externalPath")
+            if not path:
+                continue
+            url = site.job_url(path)
+            jobs.setdefault(
+                url,
+                {
+                    "title": posting.get("title", ""),
+                    "url": url,
+                    "location": posting.get("locationsText"),
+                },
+            )
+    return list(jobs.values())
+
+
+def extract_workday_jobs(url, api_base=None, **kwargs):
+    """
+    List the jobs of the Workday site behind a careers URL.
+
+    Args:
+        url (str): A Workday careers URL
+        api_base (str): Override for the API origin, e.g. a local mock server
+        **kwargs: Passed to fetch_jobs
+
+    Returns:
+        list or None: Job dicts, or None if the URL is not a Workday site
+    """
+    site = parse_workday_url(url, api_base)
+    if site is None:
+        return None
+    return fetch_jobs(site, **kwargs)